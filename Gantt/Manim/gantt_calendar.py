@@ -0,0 +1,397 @@
+"""
+Calendario hábil precalculado (lunes a viernes menos feriados).
+
+Guarda, para un horizonte de fechas, sumas acumuladas de días hábiles y de
+días de semana; así "días hábiles entre A y B" es una resta, "el n-ésimo día
+hábil después de A" es un índice y "feriados en el tramo" es una búsqueda
+binaria. Si una consulta sale del horizonte, éste se amplía (reconstrucción
+vectorizada con NumPy). Sin dependencias de Manim.
+
+Los feriados vienen de feriados.csv (país, fecha, nombre); CalendarRegistry
+compila cada selección de países una vez por proceso y la guarda en disco.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import os
+import re
+import sys
+import uuid
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Margen (días) que se agrega al ampliar el horizonte.
+_HORIZON_PAD = 366
+HOLIDAYS_FILE = Path(__file__).with_name("feriados.csv")
+DEFAULT_CALENDAR = "CL"
+_COMPILED_VERSION = 1
+# date(1970, 1, 1).toordinal(): pasa datetime64[D] (días desde 1970) a ordinal.
+_EPOCH_ORDINAL = 719163
+
+
+def _ordinal(value) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class BusinessCalendar:
+    """
+    Calendario hábil sobre [start, end] (se amplía solo si hace falta).
+
+    Para el día i del horizonte (ordinal = self._ord0 + i):
+      _cum[i]  = días hábiles en [ord0, ord0 + i)
+      _wcum[i] = días de semana (lun-vie) en [ord0, ord0 + i)
+      _biz     = posiciones de los días hábiles, en orden
+    """
+
+    def __init__(
+        self,
+        holidays=(),
+        start: date | None = None,
+        end: date | None = None,
+        years: frozenset[int] | None = None,
+    ) -> None:
+        # Años con feriados cargados (None = no se sabe; se asume completo).
+        self.years = years
+        self.holidays = frozenset(_ordinal(d) for d in holidays)
+        # Solo los feriados que caen en día de semana restan días hábiles.
+        self._weekday_holidays = sorted(o for o in self.holidays if date.fromordinal(o).weekday() < 5)
+        today = date.today().toordinal()
+        lo = _ordinal(start) if start is not None else today
+        hi = _ordinal(end) if end is not None else lo
+        self._build(min(lo, hi) - _HORIZON_PAD, max(lo, hi) + _HORIZON_PAD)
+
+    def _build(self, lo: int, hi: int) -> None:
+        ordinals = np.arange(lo, hi + 1, dtype=np.int64)
+        # date.toordinal() % 7: 1 = lunes ... 0 = domingo
+        weekday = (ordinals - 1) % 7 < 5
+        business = weekday.copy()
+        if self._weekday_holidays:
+            hol = np.asarray(self._weekday_holidays, dtype=np.int64)
+            hol = hol[(hol >= lo) & (hol <= hi)]
+            business[hol - lo] = False
+        self._ord0 = lo
+        self._ord1 = hi
+        self._business = business
+        self._cum = np.concatenate(([0], np.cumsum(business, dtype=np.int64)))
+        self._wcum = np.concatenate(([0], np.cumsum(weekday, dtype=np.int64)))
+        self._biz = np.flatnonzero(business)
+
+    def _cover(self, lo: int, hi: int) -> None:
+        if lo < self._ord0 or hi > self._ord1:
+            self._build(min(lo, self._ord0) - _HORIZON_PAD, max(hi, self._ord1) + _HORIZON_PAD)
+
+    @property
+    def start(self) -> date:
+        return date.fromordinal(self._ord0)
+
+    @property
+    def end(self) -> date:
+        return date.fromordinal(self._ord1)
+
+    # ------------------------------------------------------------- consultas
+    def is_business_day(self, day) -> bool:
+        o = _ordinal(day)
+        self._cover(o, o)
+        return bool(self._business[o - self._ord0])
+
+    def count(self, start, end) -> int:
+        """Días hábiles en [start, end], ambos incluidos (0 si end < start)."""
+        a, b = _ordinal(start), _ordinal(end)
+        if b < a:
+            return 0
+        self._cover(a, b)
+        return int(self._cum[b - self._ord0 + 1] - self._cum[a - self._ord0])
+
+    def between(self, start, end) -> int:
+        """
+        Días hábiles en [start, end), como numpy.busday_count; si end < start,
+        menos los días hábiles en (end, start].
+        """
+        a, b = _ordinal(start), _ordinal(end)
+        self._cover(min(a, b), max(a, b))
+        if b < a:
+            return -int(self._cum[a - self._ord0 + 1] - self._cum[b - self._ord0 + 1])
+        return int(self._cum[b - self._ord0] - self._cum[a - self._ord0])
+
+    def offset(self, day, n: int) -> date:
+        """
+        Avanza `day` al siguiente día hábil (si no lo es) y se mueve n días hábiles
+        (n puede ser negativo), como numpy.busday_offset(roll='forward').
+        """
+        o = _ordinal(day)
+        # ~7/5 días de calendario por día hábil, más holgura para feriados.
+        reach = abs(n) * 7 // 5 + 30
+        self._cover(o - (reach if n < 0 else 0), o + (reach if n >= 0 else 30))
+        while True:
+            rank = int(self._cum[o - self._ord0]) + n
+            if 0 <= rank < len(self._biz):
+                return date.fromordinal(self._ord0 + int(self._biz[rank]))
+            self._build(self._ord0 - reach, self._ord1 + reach)
+
+    def nth_after(self, day, n: int) -> date:
+        """n-ésimo día hábil estrictamente posterior a `day` (n >= 1)."""
+        if n < 1:
+            raise ValueError("n debe ser >= 1")
+        return self.offset(date.fromordinal(_ordinal(day) + 1), n - 1)
+
+    def weekdays_in_span(self, start, end) -> list[date]:
+        """Días lunes-viernes en (start, end] (los feriados se consultan aparte)."""
+        a, b = _ordinal(start), _ordinal(end)
+        if b <= a:
+            return []
+        self._cover(a, b)
+        offsets = np.arange(a + 1 - self._ord0, b + 1 - self._ord0)
+        weekday = (offsets + self._ord0 - 1) % 7 < 5
+        return [date.fromordinal(self._ord0 + int(i)) for i in offsets[weekday]]
+
+    def weekdays_count(self, start, end) -> int:
+        """Cantidad de días lunes-viernes en (start, end]."""
+        a, b = _ordinal(start), _ordinal(end)
+        if b <= a:
+            return 0
+        self._cover(a, b)
+        return int(self._wcum[b - self._ord0 + 1] - self._wcum[a - self._ord0 + 1])
+
+    def holidays_in_span(self, start, end) -> list[date]:
+        """Feriados en día de semana dentro de (start, end]."""
+        a, b = _ordinal(start), _ordinal(end)
+        lo = bisect_right(self._weekday_holidays, a)
+        hi = bisect_right(self._weekday_holidays, b)
+        return [date.fromordinal(o) for o in self._weekday_holidays[lo:hi]]
+
+    def holidays_count(self, start, end) -> int:
+        a, b = _ordinal(start), _ordinal(end)
+        return max(0, bisect_right(self._weekday_holidays, b) - bisect_right(self._weekday_holidays, a))
+
+    def next_business_day(self, day) -> date:
+        """El mismo día si es hábil; si no, el siguiente hábil."""
+        return self.offset(day, 0)
+
+    # ----------------------------------------------- consultas vectorizadas
+    # Reciben arreglos de fechas (datetime64[D], o secuencias de date) y responden
+    # para todos los pares en una sola operación, al estilo numpy.busday_count.
+    # Las fechas NaT dan 0 (o NaN en las fracciones).
+    def _ordinals(self, *arrays) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        (offsets desde _ord0, válidas) de cada arreglo. El horizonte se amplía una
+        sola vez para todos antes de restar _ord0, que cambia al reconstruir.
+        """
+        ords, valid = [], []
+        for days in arrays:
+            arr = np.asarray(days, dtype="datetime64[D]")
+            ok = ~np.isnat(arr)
+            ords.append(np.where(ok, arr.astype(np.int64), 0) + _EPOCH_ORDINAL)
+            valid.append(ok)
+        present = [o[ok] for o, ok in zip(ords, valid) if ok.any()]
+        if present:
+            self._cover(min(int(o.min()) for o in present), max(int(o.max()) for o in present))
+        return [(np.where(ok, o, self._ord0) - self._ord0, ok) for o, ok in zip(ords, valid)]
+
+    def count_many(self, starts, ends) -> np.ndarray:
+        """Días hábiles en [start, end] para cada par (0 si end < start)."""
+        (a, va), (b, vb) = self._ordinals(starts, ends)
+        counts = self._cum[b + 1] - self._cum[a]
+        return np.where(va & vb & (b >= a), counts, 0)
+
+    def weekdays_count_many(self, starts, ends) -> np.ndarray:
+        """Días lunes-viernes en (start, end] para cada par."""
+        (a, va), (b, vb) = self._ordinals(starts, ends)
+        counts = self._wcum[b + 1] - self._wcum[a + 1]
+        return np.where(va & vb & (b > a), counts, 0)
+
+    def holidays_count_many(self, starts, ends) -> np.ndarray:
+        """Feriados en día de semana dentro de (start, end] para cada par."""
+        (a, va), (b, vb) = self._ordinals(starts, ends)
+        hol = np.asarray(self._weekday_holidays, dtype=np.int64) - self._ord0
+        counts = np.searchsorted(hol, b, side="right") - np.searchsorted(hol, a, side="right")
+        return np.where(va & vb & (b > a), counts, 0)
+
+    def elapsed_fraction_many(self, starts, ends, today) -> np.ndarray:
+        """
+        Fracción hábil transcurrida de cada tramo [start, end] a la fecha `today`:
+        0 antes del inicio, 1 desde el fin, y días hábiles en [start, today) sobre
+        días hábiles en [start, end) entre medio. NaN si falta alguna fecha.
+        """
+        today = np.datetime64(today, "D")
+        (a, va), (b, vb), (t, _) = self._ordinals(starts, ends, np.full(np.shape(starts), today))
+        total = np.maximum(1, self._cum[b] - self._cum[a])
+        elapsed = self._cum[np.clip(t, a, b)] - self._cum[a]
+        frac = np.where(t < a, 0.0, np.where(t >= b, 1.0, elapsed / total))
+        return np.where(va & vb, frac, np.nan)
+
+    def spans(self, keys) -> tuple[list[list[date]], list[list[date]]]:
+        """
+        Para fechas ordenadas k0 < k1 < ... : días lunes-viernes y feriados de cada
+        tramo (k[i-1], k[i]], calculados de una vez sobre todo el rango.
+        """
+        if len(keys) < 2:
+            return [], []
+        ((offs, _),) = self._ordinals(keys)
+        first, last = int(offs[0]), int(offs[-1])
+        days = np.arange(first + 1, last + 1)
+        weekdays = days[(days + self._ord0 - 1) % 7 < 5]
+        cuts = np.searchsorted(weekdays, offs[1:-1], side="right")
+        hol = np.asarray(self._weekday_holidays, dtype=np.int64) - self._ord0
+        hol = hol[(hol > first) & (hol <= last)]
+        hol_cuts = np.searchsorted(hol, offs[1:-1], side="right")
+
+        def as_dates(chunk: np.ndarray) -> list[date]:
+            return [date.fromordinal(int(o) + self._ord0) for o in chunk]
+
+        return (
+            [as_dates(chunk) for chunk in np.split(weekdays, cuts)],
+            [as_dates(chunk) for chunk in np.split(hol, hol_cuts)],
+        )
+
+    def missing_years(self, start, end) -> list[int]:
+        """Años del tramo sin feriados cargados (vacío si no se conoce la cobertura)."""
+        if self.years is None:
+            return []
+        first, last = date.fromordinal(_ordinal(start)).year, date.fromordinal(_ordinal(end)).year
+        return [y for y in range(first, last + 1) if y not in self.years]
+
+    # ------------------------------------------------------- cache en disco
+    def save(self, path: Path) -> None:
+        """Guarda las tablas ya compiladas (npz, escritura atómica)."""
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp.npz")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                tmp,
+                bounds=np.array([self._ord0, self._ord1], dtype=np.int64),
+                holidays=np.array(sorted(self.holidays), dtype=np.int64),
+                years=np.array(sorted(self.years or ()), dtype=np.int64),
+                known_years=np.array([self.years is not None]),
+                business=self._business,
+                cum=self._cum,
+                wcum=self._wcum,
+                biz=self._biz,
+            )
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, path: Path) -> BusinessCalendar:
+        with np.load(path) as data:
+            cal = cls.__new__(cls)
+            cal.holidays = frozenset(int(o) for o in data["holidays"])
+            cal._weekday_holidays = sorted(o for o in cal.holidays if date.fromordinal(o).weekday() < 5)
+            cal.years = frozenset(int(y) for y in data["years"]) if bool(data["known_years"][0]) else None
+            cal._ord0, cal._ord1 = (int(v) for v in data["bounds"])
+            cal._business = data["business"]
+            cal._cum = data["cum"]
+            cal._wcum = data["wcum"]
+            cal._biz = data["biz"]
+        return cal
+
+    def __repr__(self) -> str:
+        return (
+            f"BusinessCalendar({self.start.isoformat()}..{self.end.isoformat()}, "
+            f"{len(self.holidays)} feriados)"
+        )
+
+
+def normalize_calendar_spec(spec: str | None) -> str:
+    """'cl' -> 'CL'; 'pe, cl' -> 'CL+PE' (unión de feriados de varios países)."""
+    codes = sorted({c.upper() for c in re.split(r"[\s,+;]+", spec or "") if c})
+    return "+".join(codes) or DEFAULT_CALENDAR
+
+
+class CalendarRegistry:
+    """
+    Feriados por país y año desde un archivo de datos (feriados.csv).
+    Cada selección ("CL", "CL+PE") se compila una sola vez por proceso y, si hay
+    cache_dir, se guarda en disco con clave sha256 del archivo de datos.
+    """
+
+    def __init__(self, path: Path = HOLIDAYS_FILE, cache_dir: Path | None = None) -> None:
+        self.path = path
+        self.cache_dir = cache_dir
+        self._data: dict[str, dict[date, str]] | None = None
+        self._digest: str | None = None
+        self._compiled: dict[str, BusinessCalendar] = {}
+
+    def _load(self) -> dict[str, dict[date, str]]:
+        if self._data is None:
+            raw = self.path.read_bytes()
+            self._digest = hashlib.sha256(raw).hexdigest()
+            data: dict[str, dict[date, str]] = {}
+            lines = [line for line in raw.decode("utf-8-sig").splitlines() if not line.lstrip().startswith("#")]
+            for lineno, row in enumerate(csv.DictReader(lines), start=2):
+                try:
+                    country = row["pais"].strip().upper()
+                    day = date.fromisoformat(row["fecha"].strip())
+                except (KeyError, AttributeError, ValueError) as exc:
+                    raise ValueError(f"{self.path.name}: fila {lineno} inválida: {row}") from exc
+                data.setdefault(country, {})[day] = (row.get("nombre") or "").strip()
+            self._data = data
+        return self._data
+
+    def countries(self) -> list[str]:
+        return sorted(self._load())
+
+    def years(self, country: str) -> list[int]:
+        return sorted({d.year for d in self._load().get(country.upper(), {})})
+
+    def holidays(self, spec: str | None = None) -> dict[date, str]:
+        """Feriados (fecha -> nombre) de la selección; ValueError si un país no existe."""
+        data = self._load()
+        merged: dict[date, str] = {}
+        for code in normalize_calendar_spec(spec).split("+"):
+            if code not in data:
+                raise ValueError(f"Calendario desconocido {code!r} (disponibles: {', '.join(self.countries())})")
+            for day, name in data[code].items():
+                merged.setdefault(day, name)
+        return dict(sorted(merged.items()))
+
+    def calendar(self, spec: str | None = None) -> BusinessCalendar:
+        key = normalize_calendar_spec(spec)
+        cal = self._compiled.get(key)
+        if cal is not None:
+            return cal
+        holidays = self.holidays(key)
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self.cache_dir / f"{key}-{self._digest[:16]}.v{_COMPILED_VERSION}.npz"
+            if cache_path.exists():
+                try:
+                    cal = BusinessCalendar.load(cache_path)
+                except (OSError, ValueError, KeyError):
+                    cal = None
+        if cal is None:
+            codes = key.split("+")
+            covered = set.intersection(*(set(self.years(c)) for c in codes))
+            years = sorted({d.year for d in holidays}) or [date.today().year]
+            cal = BusinessCalendar(holidays, date(years[0], 1, 1), date(years[-1], 12, 31), frozenset(covered))
+            if cache_path is not None:
+                for old in self.cache_dir.glob(f"{key}-*.npz"):
+                    if old != cache_path:
+                        try:
+                            os.remove(old)
+                        except OSError:
+                            pass
+                cal.save(cache_path)
+        self._compiled[key] = cal
+        return cal
+
+
+def warn_missing_years(cal: BusinessCalendar, start, end, label: str = "") -> None:
+    missing = cal.missing_years(start, end)
+    if missing:
+        years = ", ".join(str(y) for y in missing)
+        print(
+            f"Aviso: el calendario {label}no tiene feriados cargados para {years} "
+            f"(agrega filas en {HOLIDAYS_FILE.name}).",
+            file=sys.stderr,
+        )
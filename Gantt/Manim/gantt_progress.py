@@ -0,0 +1,245 @@
+"""
+Serie diaria de avance para la animación día a día (TLD).
+
+No depende de Manim: a partir del calendario hábil y de los valores finales
+(real %, plan %, días %) calcula de una vez, como arreglos, lo que la escena
+avanzaba paso a paso: días hábiles transcurridos, % real, % plan y % de días en
+cada fecha de la ventana. La escena solo lee la serie, y la misma serie se
+exporta a CSV desde el CLI.
+
+`SpanIndex` indexa los tramos [inicio, fin] de las tareas para responder qué
+tareas están en curso en una fecha (o se cruzan con un rango) sin recorrerlas
+todas.
+
+Reglas de la serie (las mismas que usaba el bucle de la escena):
+  - los días hábiles se cuentan desde el inicio inclusive y se topan en el total
+    de días hábiles de la ventana;
+  - cada valor crece linealmente con los días hábiles hasta su valor final;
+  - en días no hábiles los valores no cambian.
+"""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from gantt_calendar import BusinessCalendar
+
+CSV_COLUMNS = ("fecha", "habil", "dias", "real", "plan", "dias_pct", "avance", "activas")
+# Bajo este tamaño un nodo del árbol de intervalos ya no se subdivide.
+_LEAF_SIZE = 16
+
+
+def _day_numbers(days) -> np.ndarray:
+    """Fechas (date, datetime64 o secuencias) como días desde 1970."""
+    return np.asarray(days, dtype="datetime64[D]").astype(np.int64)
+
+
+class SpanIndex:
+    """
+    Índice de intervalos sobre tramos [start, end] (inclusive, en días). Los
+    conteos usan los extremos ordenados (dos búsquedas binarias); los listados,
+    un árbol de intervalos centrado: O(log n + k). Las posiciones devueltas son
+    las de las fechas de entrada; los tramos con NaT se ignoran.
+    """
+
+    __slots__ = ("_start", "_end", "_sorted_start", "_sorted_end", "_by_start", "_nodes", "_root")
+
+    def __init__(self, starts, ends) -> None:
+        start = np.asarray(starts, dtype="datetime64[D]")
+        end = np.asarray(ends, dtype="datetime64[D]")
+        valid = ~(np.isnat(start) | np.isnat(end))
+        self._start = start.astype(np.int64)
+        self._end = end.astype(np.int64)
+        positions = np.flatnonzero(valid & (self._end >= self._start))
+        self._by_start = positions[np.argsort(self._start[positions], kind="stable")]
+        self._sorted_start = self._start[self._by_start]
+        self._sorted_end = np.sort(self._end[positions])
+        # Nodo: (centro, hijo izq, hijo der, posiciones por inicio asc, por fin desc)
+        self._nodes: list[tuple[int, int, int, np.ndarray, np.ndarray]] = []
+        self._root = self._build(positions)
+
+    def _build(self, positions: np.ndarray) -> int:
+        if not len(positions):
+            return -1
+        starts = self._start[positions]
+        ends = self._end[positions]
+        if len(positions) <= _LEAF_SIZE:
+            center = int(starts.min())
+        else:
+            center = int(np.median(np.concatenate((starts, ends))))
+        here = (starts <= center) & (ends >= center)
+        mine = positions[here]
+        by_start = mine[np.argsort(self._start[mine], kind="stable")]
+        by_end = mine[np.argsort(-self._end[mine], kind="stable")]
+        node = len(self._nodes)
+        self._nodes.append((center, -1, -1, by_start, by_end))
+        left = self._build(positions[~here & (ends < center)])
+        right = self._build(positions[~here & (starts > center)])
+        self._nodes[node] = (center, left, right, by_start, by_end)
+        return node
+
+    def __len__(self) -> int:
+        return len(self._by_start)
+
+    def count_active(self, days) -> np.ndarray:
+        """Tareas en curso en cada fecha (inicio <= fecha <= fin)."""
+        x = _day_numbers(days)
+        started = np.searchsorted(self._sorted_start, x, side="right")
+        finished = np.searchsorted(self._sorted_end, x, side="left")
+        return started - finished
+
+    def count_ended(self, days) -> np.ndarray:
+        """Tareas ya terminadas en cada fecha (fin <= fecha)."""
+        return np.searchsorted(self._sorted_end, _day_numbers(days), side="right")
+
+    def count_overlapping(self, first: date, last: date) -> int:
+        """Tareas que se cruzan con [first, last]."""
+        a, b = int(_day_numbers(first)), int(_day_numbers(last))
+        if b < a:
+            return 0
+        after = len(self) - int(np.searchsorted(self._sorted_start, b, side="right"))
+        before = int(np.searchsorted(self._sorted_end, a, side="left"))
+        return len(self) - after - before
+
+    def active(self, day: date) -> list[int]:
+        """Posiciones de las tareas en curso en `day`, ordenadas."""
+        x = int(_day_numbers(day))
+        found: list[int] = []
+        node = self._root
+        while node != -1:
+            center, left, right, by_start, by_end = self._nodes[node]
+            if x < center:
+                for pos in by_start:
+                    if self._start[pos] > x:
+                        break
+                    found.append(int(pos))
+                node = left
+            elif x > center:
+                for pos in by_end:
+                    if self._end[pos] < x:
+                        break
+                    found.append(int(pos))
+                node = right
+            else:
+                found.extend(int(pos) for pos in by_start)
+                break
+        found.sort()
+        return found
+
+    def overlapping(self, first: date, last: date) -> list[int]:
+        """
+        Posiciones de las tareas que se cruzan con [first, last]: las en curso al
+        inicio del rango más las que empiezan dentro de él.
+        """
+        a, b = int(_day_numbers(first)), int(_day_numbers(last))
+        if b < a:
+            return []
+        lo = np.searchsorted(self._sorted_start, a, side="right")
+        hi = np.searchsorted(self._sorted_start, b, side="right")
+        found = self.active(first) + [int(pos) for pos in self._by_start[lo:hi]]
+        found.sort()
+        return found
+
+
+class DailySeries:
+    """
+    Valores por fecha de la ventana [start, end]; la fila i corresponde a
+    start + i días. `days[i]` es también la cantidad de segmentos de la barra de
+    escala encendidos en esa fecha (el segmento k se enciende cuando days >= k).
+    """
+
+    __slots__ = ("dates", "business", "days", "days_total", "real", "plan", "days_pct", "active")
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        business: np.ndarray,
+        days: np.ndarray,
+        days_total: int,
+        real: np.ndarray,
+        plan: np.ndarray,
+        days_pct: np.ndarray,
+        active: np.ndarray | None = None,
+    ) -> None:
+        self.dates = dates
+        self.business = business
+        self.days = days
+        self.days_total = days_total
+        self.real = real
+        self.plan = plan
+        self.days_pct = days_pct
+        # Tareas en curso en cada fecha (ceros si la serie se armó sin tareas).
+        self.active = np.zeros(len(dates), dtype=np.int64) if active is None else active
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def ratio(self) -> np.ndarray:
+        """Fracción de días hábiles transcurridos (0..1) en cada fecha."""
+        return self.days / max(1, self.days_total)
+
+    def date(self, i: int) -> date:
+        return self.dates[i].item()
+
+    def rows(self):
+        """Filas (fecha, hábil, días, real, plan, días %, avance, activas) para exportar."""
+        ratio = self.ratio
+        for i in range(len(self)):
+            yield (
+                self.date(i).isoformat(),
+                int(self.business[i]),
+                int(self.days[i]),
+                round(float(self.real[i]), 4),
+                round(float(self.plan[i]), 4),
+                round(float(self.days_pct[i]), 4),
+                round(float(ratio[i]), 4),
+                int(self.active[i]),
+            )
+
+    def write_csv(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(self.rows())
+
+
+def daily_series(
+    calendar: BusinessCalendar,
+    start: date,
+    end: date,
+    real_target: float,
+    plan_target: float,
+    days_target: float,
+    spans: SpanIndex | None = None,
+) -> DailySeries:
+    """
+    Serie de `start` a `end` (inclusive) que termina en los valores finales dados;
+    con `spans`, cuenta además las tareas en curso en cada fecha.
+    """
+    if end < start:
+        end = start
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    starts = np.full(len(dates), np.datetime64(start, "D"))
+    days_total = max(1, int(calendar.count(start, end)))
+    days = np.minimum(days_total, calendar.count_many(starts, dates))
+    business = calendar.count_many(dates, dates) > 0
+
+    def grow(target: float) -> np.ndarray:
+        return np.minimum(target, target / days_total * days)
+
+    return DailySeries(
+        dates=dates,
+        business=business,
+        days=days,
+        days_total=days_total,
+        real=grow(real_target),
+        plan=grow(plan_target),
+        days_pct=grow(days_target),
+        active=None if spans is None else spans.count_active(dates),
+    )
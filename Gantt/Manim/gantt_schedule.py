@@ -0,0 +1,421 @@
+"""
+Motor de programación sobre la columna Predecesores (CPM).
+
+No depende de Manim: trabaja con cualquier objeto que tenga id, level, start,
+end, duration y pred (p. ej. Task de gantt_timeline_v4.0.1.py), así que se puede
+usar desde el CLI, desde la escena o contra cada snapshot del XLSX.
+
+Las fechas se llevan a un eje de días hábiles (índice entero desde el primer
+inicio del plan, vía gantt_calendar.BusinessCalendar) y las pasadas hacia adelante/atrás operan sobre enteros.
+Convenciones del eje:
+  - una tarea ocupa los días [ES, EF) y dura EF - ES días hábiles;
+  - un hito (duración 0) se ubica al cierre de su día: ES = EF = índice + 1.
+
+`ScheduleModel.update` recalcula de forma incremental: solo se repropagan los
+sucesores de la tarea cambiada, y se detiene donde las fechas ya no se mueven.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import deque
+from datetime import date
+
+from gantt_calendar import BusinessCalendar
+
+LINK_TYPES = ("FS", "SS", "FF", "SF")
+
+_DURATION_RE = re.compile(r"^\s*(-?\d+(?:[.,]\d+)?)\s*d?\s*$", re.IGNORECASE)
+# 8 | 8FS | 8SS +2d | 8FF -1w (lag en días hábiles; 1w = 5d)
+_LINK_RE = re.compile(
+    r"(\d+)\s*(FS|SS|FF|SF)?\s*(?:([+-])\s*(\d+(?:[.,]\d+)?)\s*([dw])?)?",
+    re.IGNORECASE,
+)
+
+
+class ScheduleCycleError(ValueError):
+    """Los predecesores forman un ciclo; `cycle` trae los IDs en orden."""
+
+    def __init__(self, cycle: list) -> None:
+        self.cycle = cycle
+        super().__init__("Ciclo en predecesores: " + " -> ".join(str(c) for c in cycle))
+
+
+def duration_days(value: str) -> float | None:
+    """'81,5d' -> 81.5; None si la duración no es un número de días."""
+    m = _DURATION_RE.match(value or "")
+    return float(m.group(1).replace(",", ".")) if m else None
+
+
+def parse_predecessors(value: str) -> list[tuple[int, str, int]]:
+    """
+    '8, 5SS +2d' -> [(8, 'FS', 0), (5, 'SS', 2)].
+    Lags fraccionarios se redondean hacia arriba a días hábiles.
+    """
+    links: list[tuple[int, str, int]] = []
+    pos = 0
+    text = value or ""
+    for m in _LINK_RE.finditer(text):
+        if text[pos:m.start()].strip(" ,;\t"):
+            raise ValueError(f"Predecesor inválido: {text!r}")
+        pos = m.end()
+        ref, kind, sign, lag, unit = m.groups()
+        days = 0
+        if lag:
+            days = math.ceil(float(lag.replace(",", ".")) * (5 if (unit or "").lower() == "w" else 1))
+            if sign == "-":
+                days = -days
+        links.append((int(ref), (kind or "FS").upper(), days))
+    if text[pos:].strip(" ,;\t"):
+        raise ValueError(f"Predecesor inválido: {text!r}")
+    return links
+
+
+class ScheduleModel:
+    """
+    Red de dependencias de un plan y su cálculo CPM.
+
+    Nodos: tareas de detalle (las filas resumen se derivan de sus hijas) que
+    tengan fecha de inicio o predecesores. Sin predecesores, una tarea conserva
+    su inicio de la hoja; con predecesores, su inicio lo fijan los vínculos.
+    Topológico (Kahn) + pasada hacia adelante + pasada hacia atrás: O(V + E).
+    Las fechas tardías se recalculan a demanda después de un `update`.
+    """
+
+    def __init__(self, tasks: list, calendar: BusinessCalendar | object = ()) -> None:
+        # Acepta un BusinessCalendar ya armado o un iterable de feriados.
+        self.calendar = calendar if isinstance(calendar, BusinessCalendar) else BusinessCalendar(calendar)
+        self.missing: list[tuple[object, int]] = []
+
+        levels = [task.level for task in tasks]
+        nodes = [
+            task
+            for i, task in enumerate(tasks)
+            if not (i + 1 < len(tasks) and levels[i + 1] > levels[i])
+            and (task.start is not None or task.pred)
+        ]
+        self.tasks = nodes
+        self.ids = [task.id for task in nodes]
+        self.pos = {task_id: i for i, task_id in enumerate(self.ids)}
+
+        starts = [task.start or task.end for task in nodes]
+        known = [d for d in starts if d is not None]
+        self.origin = self.calendar.next_business_day(min(known) if known else date.today())
+
+        self.duration: list[int] = []
+        self.base: list[int] = []
+        for task, start in zip(nodes, starts):
+            self.duration.append(self._task_duration(task))
+            self.base.append(self.index(start) if start is not None else 0)
+        # Inicio mínimo impuesto con update(start=...) a tareas con predecesores.
+        self.not_before: dict[int, int] = {}
+
+        # Vínculos: preds[s] = [(p, tipo, lag)], succs[p] = [(s, tipo, lag)]
+        self.preds: list[list[tuple[int, str, int]]] = [[] for _ in nodes]
+        self.succs: list[list[tuple[int, str, int]]] = [[] for _ in nodes]
+        for s, task in enumerate(nodes):
+            for ref, kind, lag in parse_predecessors(task.pred):
+                p = self.pos.get(ref)
+                if p is None:
+                    self.missing.append((task.id, ref))
+                    continue
+                self.preds[s].append((p, kind, lag))
+                self.succs[p].append((s, kind, lag))
+
+        self.order = self._topological_order()
+        self.rank = [0] * len(nodes)
+        for r, node in enumerate(self.order):
+            self.rank[node] = r
+        self._late_valid = False
+        self.es = [0] * len(nodes)
+        self.ef = [0] * len(nodes)
+        self.ls = [0] * len(nodes)
+        self.lf = [0] * len(nodes)
+        self.forward()
+        self.backward()
+
+    # ------------------------------------------------------------------ eje
+    def index(self, value: date) -> int:
+        """Índice hábil de una fecha (días no hábiles avanzan al siguiente hábil)."""
+        return self.calendar.between(self.origin, self.calendar.next_business_day(value))
+
+    def date_at(self, idx: int) -> date:
+        return self.calendar.offset(self.origin, idx)
+
+    def _task_duration(self, task) -> int:
+        parsed = duration_days(task.duration)
+        if parsed == 0:
+            return 0
+        if task.start is not None and task.end is not None:
+            return max(self.calendar.count(task.start, task.end), 1)
+        if parsed is not None:
+            return max(math.ceil(parsed), 0)
+        return 1
+
+    # ----------------------------------------------------------------- grafo
+    def _topological_order(self) -> list[int]:
+        indeg = [len(p) for p in self.preds]
+        queue = deque(i for i, d in enumerate(indeg) if d == 0)
+        order: list[int] = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for s, _kind, _lag in self.succs[node]:
+                indeg[s] -= 1
+                if indeg[s] == 0:
+                    queue.append(s)
+        if len(order) < len(indeg):
+            raise ScheduleCycleError(self._find_cycle({i for i, d in enumerate(indeg) if d > 0}))
+        return order
+
+    def _find_cycle(self, remaining: set[int]) -> list:
+        """Recorre predecesores dentro de los nodos sin ordenar hasta repetir uno."""
+        node = min(remaining)
+        seen: dict[int, int] = {}
+        path: list[int] = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(p for p, _kind, _lag in self.preds[node] if p in remaining)
+        cycle = path[seen[node]:] + [node]
+        cycle.reverse()
+        return [self.ids[i] for i in cycle]
+
+    # ---------------------------------------------------------------- pasadas
+    def _start_bound(self, node: int, p: int, kind: str, lag: int) -> int:
+        """Inicio mínimo de `node` impuesto por el vínculo desde `p`."""
+        if kind == "FS":
+            return self.ef[p] + lag
+        if kind == "SS":
+            return self.es[p] + lag
+        if kind == "FF":
+            return self.ef[p] + lag - self.duration[node]
+        return self.es[p] + lag - self.duration[node]
+
+    def _early_start(self, node: int) -> int:
+        links = self.preds[node]
+        if not links:
+            # Hito: al cierre de su día.
+            return self.base[node] + (self.duration[node] == 0)
+        es = max(self._start_bound(node, p, kind, lag) for p, kind, lag in links)
+        return max(es, self.not_before.get(node, es))
+
+    def forward(self) -> None:
+        for node in self.order:
+            es = self._early_start(node)
+            self.es[node] = es
+            self.ef[node] = es + self.duration[node]
+
+    def backward(self) -> None:
+        finish = max(self.ef, default=0)
+        for node in reversed(self.order):
+            lf = finish
+            dur = self.duration[node]
+            for s, kind, lag in self.succs[node]:
+                if kind == "FS":
+                    bound = self.ls[s] - lag
+                elif kind == "SS":
+                    bound = self.ls[s] - lag + dur
+                elif kind == "FF":
+                    bound = self.lf[s] - lag
+                else:
+                    bound = self.lf[s] - lag + dur
+                if bound < lf:
+                    lf = bound
+            self.lf[node] = lf
+            self.ls[node] = lf - dur
+        self._late_valid = True
+
+    def _late(self) -> None:
+        if not self._late_valid:
+            self.backward()
+
+    def update(self, task_id, start: date | None = None, duration: int | None = None) -> dict:
+        """
+        Cambia el inicio y/o la duración (días hábiles) de una tarea y repropaga solo
+        hacia sus sucesores, en orden topológico y cortando donde nada se mueve.
+        Retorna {id: (delta inicio, delta fin)} en días hábiles de las tareas cuyas
+        fechas visibles se movieron. Las fechas tardías quedan para recalcular a demanda.
+        """
+        node = self.pos.get(task_id)
+        if node is None:
+            raise KeyError(f"La tarea {task_id} no está en la red de dependencias")
+        shown_before = self._shown(node)
+        if duration is not None:
+            if duration < 0:
+                raise ValueError("La duración no puede ser negativa")
+            self.duration[node] = duration
+        if start is not None:
+            if self.preds[node]:
+                self.not_before[node] = self.index(start) + (self.duration[node] == 0)
+            else:
+                self.base[node] = self.index(start)
+
+        moved: dict = {}
+        heap = [(self.rank[node], node)]
+        queued = {node}
+        while heap:
+            _rank, n = heapq.heappop(heap)
+            es = self._early_start(n)
+            ef = es + self.duration[n]
+            if es == self.es[n] and ef == self.ef[n]:
+                continue
+            old_start, old_end = shown_before if n == node else self._shown(n)
+            self.es[n] = es
+            self.ef[n] = ef
+            new_start, new_end = self._shown(n)
+            if (new_start, new_end) != (old_start, old_end):
+                moved[self.ids[n]] = (new_start - old_start, new_end - old_end)
+            for s, _kind, _lag in self.succs[n]:
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (self.rank[s], s))
+        if queued:
+            self._late_valid = False
+        return moved
+
+    def _shown(self, node: int) -> tuple[int, int]:
+        """Índices hábiles del primer y último día visibles (un hito cae en su día)."""
+        finish = self.ef[node] - 1
+        return (self.es[node] if self.duration[node] else finish), finish
+
+    # -------------------------------------------------------------- consultas
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    @property
+    def link_count(self) -> int:
+        return sum(len(p) for p in self.preds)
+
+    def total_float(self, task_id) -> int:
+        """Holgura total en días hábiles."""
+        self._late()
+        node = self.pos[task_id]
+        return self.ls[node] - self.es[node]
+
+    def _span(self, node: int, start: int, finish: int) -> tuple[date, date]:
+        end = self.date_at(finish - 1)
+        return (self.date_at(start) if self.duration[node] else end), end
+
+    def early_dates(self, task_id) -> tuple[date, date]:
+        node = self.pos[task_id]
+        return self._span(node, self.es[node], self.ef[node])
+
+    def late_dates(self, task_id) -> tuple[date, date]:
+        self._late()
+        node = self.pos[task_id]
+        return self._span(node, self.ls[node], self.lf[node])
+
+    def project_finish(self) -> date | None:
+        return self.date_at(max(self.ef) - 1) if self.tasks else None
+
+    def critical_ids(self) -> list:
+        """Tareas con holgura total <= 0, en orden topológico."""
+        self._late()
+        return [self.ids[n] for n in self.order if self.ls[n] - self.es[n] <= 0]
+
+    def critical_path(self) -> list:
+        """
+        Cadena crítica que termina en el fin del proyecto, recorriendo hacia atrás
+        los vínculos que fijan el inicio temprano de cada tarea.
+        """
+        if not self.tasks:
+            return []
+        self._late()
+        node = max(self.order, key=lambda n: self.ef[n])
+        chain = [node]
+        while True:
+            driver = next(
+                (
+                    p
+                    for p, kind, lag in self.preds[node]
+                    if self._start_bound(node, p, kind, lag) == self.es[node] and self.ls[p] <= self.es[p]
+                ),
+                None,
+            )
+            if driver is None:
+                break
+            chain.append(driver)
+            node = driver
+        chain.reverse()
+        return [self.ids[n] for n in chain]
+
+
+def rollup(tasks: list, parent: list[int] | None = None) -> list[tuple[date | None, date | None, float | None]]:
+    """
+    Fechas y avance derivados para cada fila, en una pasada post-orden: al recorrer
+    la hoja de abajo hacia arriba cada fila ya tiene acumulado su subárbol y lo
+    suma a su padre. Resumen = inicio mínimo, fin máximo y avance ponderado por la
+    duración de sus tareas de detalle (sin duración con peso, promedio simple).
+    Las filas de detalle conservan sus valores, y un resumen cuyo subárbol no tiene
+    fechas o avance conserva los suyos. `parent` (posición del padre, -1 en
+    raíces) se calcula desde los niveles si no se entrega.
+    """
+    n = len(tasks)
+    if parent is None:
+        parent = [-1] * n
+        stack: list[int] = []
+        for i, task in enumerate(tasks):
+            while stack and tasks[stack[-1]].level >= task.level:
+                stack.pop()
+            parent[i] = stack[-1] if stack else -1
+            stack.append(i)
+
+    start: list[date | None] = [None] * n
+    end: list[date | None] = [None] * n
+    weight = [0.0] * n  # suma de duraciones de las hojas
+    weighted = [0.0] * n  # suma de duración * avance
+    count = [0] * n  # hojas con avance
+    total = [0.0] * n  # suma simple de avances
+    has_children = [False] * n
+    for i in range(n):
+        if parent[i] >= 0:
+            has_children[parent[i]] = True
+
+    def own_progress(i: int) -> None:
+        """Peso y avance de la propia fila (hojas, o resúmenes sin avance en su subárbol)."""
+        task = tasks[i]
+        days = duration_days(task.duration)
+        if days is None and task.start is not None and task.end is not None:
+            days = (task.end - task.start).days + 1
+        weight[i] = max(days or 0.0, 0.0)
+        weighted[i] = weight[i] * (task.pct or 0.0)
+        if task.pct is not None:
+            count[i], total[i] = 1, task.pct
+
+    result: list[tuple[date | None, date | None, float | None]] = [(None, None, None)] * n
+    for i in range(n - 1, -1, -1):
+        task = tasks[i]
+        if not has_children[i]:
+            start[i], end[i] = task.start, task.end
+            own_progress(i)
+            result[i] = (task.start, task.end, task.pct)
+        else:
+            # Lo que el subárbol no aporta se toma de la propia fila (y se propaga).
+            if start[i] is None:
+                start[i] = task.start
+            if end[i] is None:
+                end[i] = task.end
+            if weight[i] > 0:
+                pct = weighted[i] / weight[i]
+            elif count[i]:
+                pct = total[i] / count[i]
+            else:
+                own_progress(i)
+                pct = task.pct
+            result[i] = (start[i], end[i], pct)
+
+        p = parent[i]
+        if p < 0:
+            continue
+        if start[i] is not None and (start[p] is None or start[i] < start[p]):
+            start[p] = start[i]
+        if end[i] is not None and (end[p] is None or end[i] > end[p]):
+            end[p] = end[i]
+        weight[p] += weight[i]
+        weighted[p] += weighted[i]
+        count[p] += count[i]
+        total[p] += total[i]
+    return result
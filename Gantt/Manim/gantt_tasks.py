@@ -0,0 +1,1941 @@
+"""
+Tareas del Gantt sin Manim: lectura del XLSX (openpyxl o lector OOXML nativo),
+cache en disco, jerarquía y filtros (--nivel, --id, --where), tabla columnar,
+serie diaria, archivo binario .gtasks y el CLI que genera filter_gantt.tasks.
+
+gantt_timeline_v4.0.1.py importa de aquí lo que usan las escenas; así el CLI y
+las pruebas de los lectores y filtros corren aunque Manim no esté instalado.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import math
+import mmap
+import re
+import shlex
+import struct
+import sys
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import datetime, timedelta, date
+from pathlib import Path
+from typing import Callable
+import uuid
+import os
+
+import numpy as np
+
+from gantt_calendar import BusinessCalendar, CalendarRegistry, normalize_calendar_spec, warn_missing_years
+from gantt_progress import DailySeries, SpanIndex, daily_series
+from gantt_schedule import ScheduleCycleError, ScheduleModel, duration_days, rollup
+
+
+# =============================================================================
+# Funciones auxiliares
+# =============================================================================
+def parse_date(value) -> date | None:
+    """Fecha nativa desde datetime/date o texto (dd/mm/yy, dd/mm/yyyy, yyyy-mm-dd)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    for fmt in ("%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_percent(value) -> float | None:
+    """Avance numérico 0-100 desde número (fracción 0-1 o entero) o texto ('8%')."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        pct = value * 100 if 0 <= value <= 1 else value
+        return float(int(round(pct)))
+    text = str(value).strip().rstrip("%").strip()
+    if not text:
+        return None
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return None
+
+
+# =============================================================================
+# Modelo de tarea
+# =============================================================================
+class Task:
+    """
+    Tarea normalizada. Fechas como `date` y avance numérico (0-100) resueltos una
+    sola vez al cargar; los filtros y ambas escenas comparten las mismas instancias.
+    Igualdad y hash son por identidad (los filtros deduplican por instancia); para
+    comparar contenido, usar to_row() o to_record().
+    """
+
+    __slots__ = ("id", "level", "name", "status", "assigned", "start", "end", "pct", "duration", "pred")
+
+    def __init__(
+        self,
+        id,
+        level: int,
+        name: str,
+        status: str = "",
+        assigned: str = "",
+        start: date | None = None,
+        end: date | None = None,
+        pct: float | None = None,
+        duration: str = "",
+        pred: str = "",
+    ) -> None:
+        self.id = id
+        self.level = level
+        self.name = name
+        self.status = status
+        self.assigned = assigned
+        self.start = start
+        self.end = end
+        self.pct = pct
+        self.duration = duration
+        self.pred = pred
+
+    @property
+    def start_str(self) -> str:
+        return self.start.strftime("%d/%m/%y") if self.start else ""
+
+    @property
+    def end_str(self) -> str:
+        return self.end.strftime("%d/%m/%y") if self.end else ""
+
+    @property
+    def pct_str(self) -> str:
+        return f"{self.pct:g}%" if self.pct is not None else ""
+
+    @classmethod
+    def from_row(cls, row: list) -> Task:
+        """Desde la fila posicional de filter_gantt.tasks (fechas dd/mm/yy, avance 'NN%')."""
+        task_id, level, name, status, assigned, start, end, pct, duration, pred = row
+        return cls(
+            task_id, level, name, status, assigned, parse_date(start), parse_date(end), parse_percent(pct), duration, pred
+        )
+
+    def to_row(self) -> list:
+        """Fila posicional con el formato de texto de filter_gantt.tasks."""
+        return [
+            self.id,
+            self.level,
+            self.name,
+            self.status,
+            self.assigned,
+            self.start_str,
+            self.end_str,
+            self.pct_str,
+            self.duration,
+            self.pred,
+        ]
+
+    @classmethod
+    def from_record(cls, rec: list) -> Task:
+        """Desde el registro JSON de la cache (fechas ISO, avance numérico)."""
+        task_id, level, name, status, assigned, start, end, pct, duration, pred = rec
+        return cls(
+            task_id,
+            level,
+            name,
+            status,
+            assigned,
+            date.fromisoformat(start) if start else None,
+            date.fromisoformat(end) if end else None,
+            pct,
+            duration,
+            pred,
+        )
+
+    def to_record(self) -> list:
+        return [
+            self.id,
+            self.level,
+            self.name,
+            self.status,
+            self.assigned,
+            self.start.isoformat() if self.start else None,
+            self.end.isoformat() if self.end else None,
+            self.pct,
+            self.duration,
+            self.pred,
+        ]
+
+    def __repr__(self) -> str:
+        return f"Task({self.id!r}, level={self.level}, name={self.name!r})"
+
+
+TASK_COLUMNS = {
+    "id": ("id", "uid", "uid "),
+    "name": ("nombre de la tarea", "nombre", "task name", "name"),
+    "status": ("estado", "status"),
+    "assigned": ("asignado a", "asignado", "assigned"),
+    "start": ("fecha de inicio", "inicio", "start", "start date"),
+    "end": ("fecha de finalización", "fecha de finalizacion", "fin", "finish", "end", "end date"),
+    "pct": ("porcentaje completo", "% completo", "avance", "percent complete", "percentcomplete"),
+    "duration": ("duración", "duracion", "duration"),
+    "pred": ("predecesores", "predecessors", "pred"),
+}
+
+
+def _resolve_task_columns(headers: list) -> dict[str, int | None]:
+    """Mapea cada campo de TASK_COLUMNS a su columna (base 0) según el encabezado."""
+    header_map = {str(val).strip().lower(): idx for idx, val in enumerate(headers) if val}
+    cols: dict[str, int | None] = {}
+    for field, names in TASK_COLUMNS.items():
+        cols[field] = next((header_map[n.strip().lower()] for n in names if n.strip().lower() in header_map), None)
+    if cols["name"] is None:
+        raise ValueError("No se encontro la columna 'Nombre de la tarea' en el XLSX.")
+    return cols
+
+
+def _pick(values: list, col: int | None, default=""):
+    """Valor de la columna (base 0) o default si el campo no existe; las filas pueden ser más cortas."""
+    if col is None:
+        return default
+    return values[col] if col < len(values) else None
+
+
+def _make_task(row_idx: int, values: list, level: int, cols: dict[str, int | None]) -> Task:
+    """Arma la tarea normalizada a partir de los valores crudos de la hoja."""
+    task_id = _pick(values, cols["id"], row_idx - 1)
+    status = _pick(values, cols["status"])
+    assigned = _pick(values, cols["assigned"])
+    duration = _pick(values, cols["duration"])
+    pred = _pick(values, cols["pred"])
+
+    if isinstance(task_id, float) and task_id.is_integer():
+        task_id = int(task_id)
+
+    return Task(
+        task_id,
+        level,
+        str(values[cols["name"]]).strip(),
+        str(status).strip() if status is not None else "",
+        str(assigned).strip() if assigned is not None else "",
+        parse_date(_pick(values, cols["start"])),
+        parse_date(_pick(values, cols["end"])),
+        parse_percent(_pick(values, cols["pct"])),
+        str(duration).strip() if duration is not None else "",
+        str(pred).strip() if pred is not None else "",
+    )
+
+
+def _load_tasks_openpyxl(path: Path) -> list[Task]:
+    """Lector openpyxl en modo streaming (read_only); se usa como respaldo del lector OOXML."""
+    from openpyxl import load_workbook  # solo se importa si hace falta
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[wb.sheetnames[0]]
+        rows = ws.iter_rows()
+        cols = _resolve_task_columns([cell.value for cell in next(rows, ())])
+        col_name = cols["name"]
+
+        tasks = []
+        for row_idx, row in enumerate(rows, start=2):
+            # En read_only las filas pueden venir más cortas que el encabezado.
+            if col_name >= len(row):
+                continue
+            name_cell = row[col_name]
+            name_val = name_cell.value
+            if name_val is None or str(name_val).strip() == "":
+                continue
+            alignment = name_cell.alignment
+            level = int(alignment.indent or 0) if alignment is not None else 0
+            tasks.append(_make_task(row_idx, [cell.value for cell in row], level, cols))
+    finally:
+        wb.close()
+
+    return tasks
+
+
+# -----------------------------------------------------------------------------
+# Lector OOXML nativo (zip + iterparse), sin openpyxl
+# -----------------------------------------------------------------------------
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+_FORMAT_NOISE_RE = re.compile(r'"[^"]*"|\\.|_.|\[(?!h+\]|m+\]|s+\])[^\]]*\]')
+_DATE_TOKEN_RE = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+
+class _OoxmlUnsupported(Exception):
+    """El archivo no tiene la estructura esperada; se usa openpyxl."""
+
+
+def _is_date_format(code: str) -> bool:
+    section = _FORMAT_NOISE_RE.sub("", code.split(";")[0])
+    return bool(_DATE_TOKEN_RE.search(section))
+
+
+def _excel_serial_to_datetime(value: float, date1904: bool) -> datetime:
+    if date1904:
+        base = datetime(1904, 1, 1)
+    else:
+        base = datetime(1899, 12, 30)
+        if 0 < value < 60:
+            # Excel considera 1900 bisiesto; antes del 1/3/1900 hay un día de desfase.
+            value += 1
+    return base + timedelta(days=value)
+
+
+def _ooxml_part(target: str) -> str:
+    target = target.lstrip("/")
+    return target if target.startswith("xl/") else f"xl/{target}"
+
+
+def _read_workbook_parts(zf: zipfile.ZipFile) -> tuple[str, str | None, str | None, bool]:
+    """Retorna (hoja1, sharedStrings, styles, date1904) resolviendo workbook.xml y sus rels."""
+    wb_root = ET.fromstring(zf.read("xl/workbook.xml"))
+    pr = wb_root.find(f"{_NS_MAIN}workbookPr")
+    date1904 = pr is not None and pr.get("date1904", "false").lower() in ("1", "true")
+    first = wb_root.find(f"{_NS_MAIN}sheets/{_NS_MAIN}sheet")
+    if first is None:
+        raise _OoxmlUnsupported("workbook sin hojas")
+
+    rels_root = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets: dict[str, str] = {}
+    shared = styles = None
+    for rel in rels_root.iter(f"{_NS_PKG_REL}Relationship"):
+        target = _ooxml_part(rel.get("Target", ""))
+        targets[rel.get("Id", "")] = target
+        rel_type = rel.get("Type", "")
+        if rel_type.endswith("/sharedStrings"):
+            shared = target
+        elif rel_type.endswith("/styles"):
+            styles = target
+    sheet = targets.get(first.get(f"{_NS_REL}id", ""))
+    if sheet is None:
+        raise _OoxmlUnsupported("no se encontró la primera hoja en workbook.xml.rels")
+    return sheet, shared, styles, date1904
+
+
+def _read_shared_strings(zf: zipfile.ZipFile, part: str | None) -> list[str]:
+    if part is None or part not in zf.namelist():
+        return []
+    strings: list[str] = []
+    with zf.open(part) as f:
+        for _event, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != f"{_NS_MAIN}si":
+                continue
+            # Texto plano (<t>) o enriquecido (<r><t>); se ignoran las guías fonéticas (<rPh>).
+            parts = []
+            for child in elem:
+                if child.tag == f"{_NS_MAIN}t":
+                    parts.append(child.text or "")
+                elif child.tag == f"{_NS_MAIN}r":
+                    t = child.find(f"{_NS_MAIN}t")
+                    if t is not None:
+                        parts.append(t.text or "")
+            strings.append("".join(parts))
+            elem.clear()
+    return strings
+
+
+def _read_cell_formats(zf: zipfile.ZipFile, part: str | None) -> tuple[list[int], list[bool]]:
+    """Tabla cellXfs: (indent, es_fecha) por índice de estilo."""
+    if part is None or part not in zf.namelist():
+        return [], []
+    custom_dates: dict[int, bool] = {}
+    indents: list[int] = []
+    is_date: list[bool] = []
+    in_cell_xfs = False
+    with zf.open(part) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            tag = elem.tag
+            if tag == f"{_NS_MAIN}cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and tag == f"{_NS_MAIN}numFmt":
+                custom_dates[int(elem.get("numFmtId", "0"))] = _is_date_format(elem.get("formatCode", ""))
+            elif event == "end" and tag == f"{_NS_MAIN}xf" and in_cell_xfs:
+                align = elem.find(f"{_NS_MAIN}alignment")
+                indent = align.get("indent") if align is not None else None
+                indents.append(int(float(indent)) if indent else 0)
+                fmt_id = int(elem.get("numFmtId", "0"))
+                is_date.append(custom_dates.get(fmt_id, fmt_id in _BUILTIN_DATE_FORMATS))
+    return indents, is_date
+
+
+def _column_index(letters: str) -> int:
+    """'B' -> 1 (base 0)."""
+    col = 0
+    for ch in letters:
+        col = col * 26 + (ord(ch) - 64)
+    return col - 1
+
+
+def _iter_sheet_rows(
+    zf: zipfile.ZipFile,
+    part: str,
+    shared: list[str],
+    is_date: list[bool],
+    date1904: bool,
+):
+    """Genera (fila, valores, estilos) por fila usando iterparse; libera cada fila al terminar."""
+    tag_row = f"{_NS_MAIN}row"
+    tag_c = f"{_NS_MAIN}c"
+    tag_v = f"{_NS_MAIN}v"
+    tag_is = f"{_NS_MAIN}is"
+    tag_t = f"{_NS_MAIN}t"
+    row_counter = 0
+    parent = None
+    col_cache: dict[str, int] = {}
+    with zf.open(part) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{_NS_MAIN}sheetData":
+                    parent = elem
+                continue
+            if elem.tag != tag_row:
+                continue
+            row_attr = elem.get("r")
+            row_counter = int(row_attr) if row_attr else row_counter + 1
+            values: list = []
+            styles: list[int] = []
+            for c in elem.iter(tag_c):
+                ref = c.get("r")
+                if ref:
+                    letters = ref.rstrip("0123456789")
+                    col = col_cache.get(letters)
+                    if col is None:
+                        col = col_cache[letters] = _column_index(letters)
+                else:
+                    col = len(values)
+                if col >= len(values):
+                    pad = col + 1 - len(values)
+                    values.extend([None] * pad)
+                    styles.extend([0] * pad)
+                style = int(c.get("s", "0"))
+                styles[col] = style
+                cell_type = c.get("t", "n")
+                if cell_type == "inlineStr":
+                    node = c.find(tag_is)
+                    values[col] = "".join(t.text or "" for t in node.iter(tag_t)) if node is not None else None
+                    continue
+                v = c.find(tag_v)
+                raw = v.text if v is not None else None
+                if raw is None:
+                    continue
+                if cell_type == "s":
+                    values[col] = shared[int(raw)]
+                elif cell_type in ("str", "e"):
+                    values[col] = raw
+                elif cell_type == "b":
+                    values[col] = raw.strip() in ("1", "true")
+                elif cell_type == "d":
+                    values[col] = datetime.fromisoformat(raw.rstrip("Z"))
+                else:
+                    number = float(raw) if ("." in raw or "E" in raw or "e" in raw) else int(raw)
+                    if style < len(is_date) and is_date[style]:
+                        number = _excel_serial_to_datetime(number, date1904)
+                    values[col] = number
+            yield row_counter, values, styles
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+
+
+def _load_tasks_ooxml(path: Path) -> list[Task]:
+    """
+    Lector directo del layout de exportación Smartsheet: primera hoja, sharedStrings
+    y la tabla cellXfs de styles.xml (indent -> nivel). Mismas filas que openpyxl.
+    """
+    layout_errors = (KeyError, IndexError, ValueError, zipfile.BadZipFile, ET.ParseError)
+    try:
+        zf = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as exc:
+        raise _OoxmlUnsupported(str(exc)) from exc
+    with zf:
+        try:
+            sheet, shared_part, styles_part, date1904 = _read_workbook_parts(zf)
+            shared = _read_shared_strings(zf, shared_part)
+            indents, is_date = _read_cell_formats(zf, styles_part)
+
+            rows = _iter_sheet_rows(zf, sheet, shared, is_date, date1904)
+            first = next(rows, None)
+        except layout_errors as exc:
+            raise _OoxmlUnsupported(str(exc)) from exc
+        # El encabezado es la fila 1; si la hoja comienza más abajo se delega a openpyxl.
+        if first is None or first[0] != 1:
+            raise _OoxmlUnsupported("la hoja no comienza en la fila 1")
+        # Fuera del try: si falta la columna de nombre el archivo es inválido para
+        # cualquier lector, así que el ValueError llega tal cual (sin reintentar con openpyxl).
+        cols = _resolve_task_columns(first[1])
+        col_name = cols["name"]
+
+        tasks = []
+        try:
+            for row_idx, values, styles in rows:
+                if col_name >= len(values):
+                    continue
+                name_val = values[col_name]
+                if name_val is None or str(name_val).strip() == "":
+                    continue
+                style = styles[col_name]
+                level = indents[style] if style < len(indents) else 0
+                tasks.append(_make_task(row_idx, values, level, cols))
+        except layout_errors as exc:
+            raise _OoxmlUnsupported(str(exc)) from exc
+    return tasks
+
+
+def load_tasks_from_xlsx(path: Path, engine: str = "auto") -> list[Task]:
+    """
+    Lee las tareas de la primera hoja. engine: "ooxml" (lector nativo), "openpyxl"
+    o "auto" (nativo y, si el archivo no calza con el layout esperado, openpyxl).
+    """
+    if engine == "openpyxl":
+        return _load_tasks_openpyxl(path)
+    try:
+        return _load_tasks_ooxml(path)
+    except _OoxmlUnsupported:
+        if engine == "ooxml":
+            raise
+        return _load_tasks_openpyxl(path)
+
+
+# =============================================================================
+# Cache en disco del XLSX parseado
+# =============================================================================
+# Subir PARSER_VERSION cuando cambie la forma de las filas que entrega
+# load_tasks_from_xlsx: las entradas de versiones anteriores dejan de usarse
+# y se eliminan en la siguiente limpieza.
+PARSER_VERSION = 2
+CACHE_DIR = Path(os.environ.get("GANTT_CACHE_DIR", Path(__file__).with_name(".cache")))
+CACHE_MAX_ENTRIES = 32
+CACHE_MAX_AGE_DAYS = 30
+# Resultados de cadenas de filtros: muchas entradas pequeñas, con tope de tamaño total.
+FILTER_CACHE_MAX_ENTRIES = 256
+FILTER_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+def compute_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cached_sha256(path: Path) -> str:
+    """
+    sha256 del archivo, memorizado por (ruta, tamaño, mtime_ns) en CACHE_DIR/hashes.json
+    para no releer un XLSX que no cambió.
+    """
+    memo_path = CACHE_DIR / "hashes.json"
+    try:
+        st = path.stat()
+        key = str(path.resolve())
+    except OSError:
+        return compute_sha256(path)
+    try:
+        memo = json.loads(memo_path.read_text(encoding="utf-8"))
+        if not isinstance(memo, dict):
+            memo = {}
+    except (OSError, ValueError):
+        memo = {}
+    hit = memo.get(key)
+    if isinstance(hit, list) and len(hit) == 3 and hit[:2] == [st.st_size, st.st_mtime_ns]:
+        return hit[2]
+    digest = compute_sha256(path)
+    memo[key] = [st.st_size, st.st_mtime_ns, digest]
+    tmp = memo_path.with_name(f"{memo_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(memo, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, memo_path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return digest
+
+
+class TaskCache:
+    """
+    Cache en disco de listas de tareas, una entrada JSON por clave.
+    Política: LRU por mtime (cada lectura renueva la entrada), máximo
+    max_entries archivos (y max_bytes en total, si se indica) y expiración
+    por antigüedad.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_age_days: float = CACHE_MAX_AGE_DAYS,
+        version: int = PARSER_VERSION,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.suffix = f".v{version}.json"
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> list | None:
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                tasks = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return tasks if isinstance(tasks, list) else None
+
+    def put(self, key: str, tasks: list) -> None:
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(tasks, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Elimina versiones antiguas del parser, entradas vencidas y el exceso LRU."""
+        try:
+            entries = [p for p in self.root.iterdir() if p.is_file()]
+        except OSError:
+            return
+        now = time.time()
+        live: list[tuple[float, int, Path]] = []
+        stale: list[Path] = []
+        for p in entries:
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if p.name.endswith(self.suffix) and now - st.st_mtime <= self.max_age:
+                live.append((st.st_mtime, st.st_size, p))
+            else:
+                stale.append(p)
+        live.sort(reverse=True)
+        stale.extend(p for _mtime, _size, p in live[self.max_entries:])
+        if self.max_bytes is not None:
+            total = 0
+            for _mtime, size, p in live[:self.max_entries]:
+                total += size
+                if total > self.max_bytes:
+                    stale.append(p)
+        for p in stale:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        try:
+            entries = list(self.root.iterdir())
+        except OSError:
+            return
+        for p in entries:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+# Calendarios de feriados (feriados.csv), compilados una vez y cacheados en .cache/calendars
+CALENDAR_REGISTRY = CalendarRegistry(cache_dir=CACHE_DIR / "calendars")
+
+
+def resolve_calendar_spec(explicit: str | None = None) -> str:
+    """
+    Calendario del proyecto: argumento explícito, GANTT_CALENDARIO, o la clave
+    `calendario:` de run_gantt_pipeline.parametros; por defecto Chile (CL).
+    """
+    spec = explicit or os.environ.get("GANTT_CALENDARIO")
+    if not spec:
+        cfg_path = Path(__file__).with_name("run_gantt_pipeline.parametros")
+        try:
+            for line in cfg_path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if line.startswith("calendario:"):
+                    spec = line.split(":", 1)[1].strip()
+                    break
+        except OSError:
+            pass
+    return normalize_calendar_spec(spec)
+
+
+def project_calendar(spec: str | None = None) -> BusinessCalendar:
+    return CALENDAR_REGISTRY.calendar(resolve_calendar_spec(spec))
+
+
+def load_tasks_cached(path: Path, use_cache: bool = True, sha256: str | None = None) -> list[Task]:
+    """Igual que load_tasks_from_xlsx, pero reutiliza la tabla si el XLSX no cambió (sha256)."""
+    if not use_cache:
+        return load_tasks_from_xlsx(path)
+    cache = TaskCache(CACHE_DIR / "xlsx")
+    key = sha256 or compute_sha256(path)
+    records = cache.get(key)
+    if records is not None:
+        return [Task.from_record(rec) for rec in records]
+    tasks = load_tasks_from_xlsx(path)
+    cache.put(key, [task.to_record() for task in tasks])
+    return tasks
+
+
+def _parse_levels(values: list[str] | None) -> list[int]:
+    if not values:
+        return []
+    levels: list[int] = []
+    for raw in values:
+        parts = [p.strip() for p in raw.split(",") if p.strip()]
+        for part in parts:
+            levels.append(int(part))
+    return levels
+
+
+class TaskHierarchy:
+    """
+    Índice jerárquico de una lista de tareas en orden de hoja (preorden), construido
+    en una pasada: id -> posición, padre de cada fila y fin (exclusivo) de su
+    subárbol, que es el rango contiguo [pos + 1, end[pos]).
+    Las consultas recorren solo las filas que retornan.
+    """
+
+    __slots__ = ("tasks", "parent", "end", "pos_by_id", "by_level")
+
+    def __init__(self, tasks: list[Task]) -> None:
+        n = len(tasks)
+        self.tasks = tasks
+        self.parent = [-1] * n
+        self.end = [n] * n
+        self.pos_by_id: dict[object, int] = {}
+        self.by_level: dict[int, list[int]] = {}
+        stack: list[int] = []
+        for pos, task in enumerate(tasks):
+            level = task.level
+            while stack and tasks[stack[-1]].level >= level:
+                self.end[stack.pop()] = pos
+            if stack:
+                self.parent[pos] = stack[-1]
+            stack.append(pos)
+            # Con IDs repetidos gana la primera fila, igual que el filtro lineal.
+            self.pos_by_id.setdefault(task.id, pos)
+            self.by_level.setdefault(level, []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def position(self, task_id: object) -> int | None:
+        return self.pos_by_id.get(task_id)
+
+    def ancestors(self, pos: int) -> list[int]:
+        """Posiciones de los ancestros, de la raíz hacia abajo (sin incluir pos)."""
+        chain: list[int] = []
+        pos = self.parent[pos]
+        while pos >= 0:
+            chain.append(pos)
+            pos = self.parent[pos]
+        chain.reverse()
+        return chain
+
+    def children(self, pos: int) -> list[int]:
+        """Hijos directos: se salta de hermano en hermano con end[]."""
+        result: list[int] = []
+        child = pos + 1
+        stop = self.end[pos]
+        while child < stop:
+            result.append(child)
+            child = self.end[child]
+        return result
+
+    def subtree(self, pos: int, max_depth: int | None = None) -> list[int]:
+        """
+        Descendientes de pos en orden de hoja. max_depth limita la diferencia de
+        nivel respecto de pos; una fila demasiado profunda descarta todo su subárbol.
+        """
+        stop = self.end[pos]
+        if max_depth is None:
+            return list(range(pos + 1, stop))
+        limit = self.tasks[pos].level + max_depth
+        result: list[int] = []
+        child = pos + 1
+        while child < stop:
+            if self.tasks[child].level > limit:
+                child = self.end[child]
+                continue
+            result.append(child)
+            child += 1
+        return result
+
+    def select(self, task_ids: list[object], max_depth: int | None = None) -> list[Task]:
+        """
+        Unión de (ancestros + tarea + subárbol) para cada ID, sin duplicados y en
+        orden de hoja. Los IDs que no existen se ignoran.
+        """
+        picked: set[int] = set()
+        for task_id in task_ids:
+            pos = self.position(task_id)
+            if pos is None:
+                continue
+            picked.update(self.ancestors(pos))
+            picked.add(pos)
+            picked.update(self.subtree(pos, max_depth))
+        return [self.tasks[pos] for pos in sorted(picked)]
+
+    def _with_ancestors(self, positions) -> list[Task]:
+        picked: set[int] = set()
+        for pos in positions:
+            # Se sube por los padres hasta un ancestro ya incluido.
+            while pos >= 0 and pos not in picked:
+                picked.add(pos)
+                pos = self.parent[pos]
+        return [self.tasks[pos] for pos in sorted(picked)]
+
+    def with_levels(self, levels: list[int]) -> list[Task]:
+        """Filas de los niveles pedidos más sus ancestros, en orden de hoja."""
+        return self._with_ancestors(pos for level in set(levels) for pos in self.by_level.get(level, ()))
+
+    def matching(self, predicate: Callable[[Task], bool]) -> list[Task]:
+        """Filas que cumplen el predicado (una pasada) más sus ancestros."""
+        return self._with_ancestors(pos for pos, task in enumerate(self.tasks) if predicate(task))
+
+
+def rollup_tasks(tasks: list[Task], index: TaskHierarchy | None = None) -> dict[int, Task]:
+    """
+    Filas resumen con fechas y avance derivados de sus hijas (gantt_schedule.rollup),
+    como copias indexadas por id() de la fila original; las de detalle no se tocan.
+    """
+    index = index or TaskHierarchy(tasks)
+    rolled: dict[int, Task] = {}
+    for pos, (start, end, pct) in enumerate(rollup(tasks, index.parent)):
+        if index.end[pos] == pos + 1:
+            continue
+        task = tasks[pos]
+        copy = Task(task.id, task.level, task.name, task.status, task.assigned, start, end,
+                    None if pct is None else float(round(pct)), task.duration, task.pred)
+        rolled[id(task)] = copy
+    return rolled
+
+
+def filter_by_levels(tasks: list[Task], levels: list[int]) -> list[Task]:
+    """Filtra por niveles e incluye ancestros para dar contexto visual."""
+    if not levels:
+        return tasks
+    return TaskHierarchy(tasks).with_levels(levels)
+
+
+def parse_filter_sequence(argv: list[str]) -> list[tuple[str, list[int] | int | str]]:
+    """
+    Parsea --nivel/--id/--where en el orden recibido para aplicar filtros anidados.
+    `--id 3,6` selecciona varios IDs a la vez (unión de sus ramas).
+    """
+    seq: list[tuple[str, list[int] | int | str]] = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--nivel":
+            if i + 1 >= len(argv):
+                raise SystemExit("Error: --nivel requiere un valor.")
+            levels = _parse_levels([argv[i + 1]])
+            seq.append(("nivel", levels))
+            i += 2
+            continue
+        if arg == "--id":
+            if i + 1 >= len(argv):
+                raise SystemExit("Error: --id requiere un valor.")
+            try:
+                ids = [int(p.strip()) for p in argv[i + 1].split(",") if p.strip()]
+            except ValueError as exc:
+                raise SystemExit("Error: --id requiere un entero.") from exc
+            if not ids:
+                raise SystemExit("Error: --id requiere un entero.")
+            seq.append(("id", ids[0] if len(ids) == 1 else ids))
+            i += 2
+            continue
+        if arg == "--where":
+            if i + 1 >= len(argv):
+                raise SystemExit("Error: --where requiere una expresión.")
+            expr = " ".join(argv[i + 1].split())
+            try:
+                compile_filter(expr)
+            except ValueError as exc:
+                raise SystemExit(f"Error: --where: {exc}") from exc
+            seq.append(("where", expr))
+            i += 2
+            continue
+        i += 1
+    return seq
+
+
+def split_by_pipe(argv: list[str]) -> list[list[str]]:
+    """Divide argumentos en segmentos separados por '|'."""
+    segments: list[list[str]] = []
+    current: list[str] = []
+    for arg in argv:
+        if arg == "|":
+            segments.append(current)
+            current = []
+        else:
+            current.append(arg)
+    segments.append(current)
+    return segments
+
+
+def describe_filter_spec(segments: list[list[str]], expand: bool = False) -> str:
+    """Forma normalizada de la cadena de filtros, p. ej. '--nivel 1,2 | --id 6 --expand'."""
+    parts = []
+    for seg in segments:
+        steps = []
+        for kind, value in parse_filter_sequence(seg):
+            if kind == "nivel":
+                steps.append("--nivel " + ",".join(str(v) for v in value))
+            elif kind == "where":
+                steps.append(f"--where {value!r}")
+            else:
+                ids = value if isinstance(value, list) else [value]
+                steps.append("--id " + ",".join(str(v) for v in ids))
+        if steps:
+            parts.append(" ".join(steps))
+    spec = " | ".join(parts)
+    if expand:
+        spec = f"{spec} --expand".strip()
+    return spec
+
+
+def filter_by_id_with_context(tasks: list[Task], task_id: int, max_depth: int | None = None) -> list[Task]:
+    """
+    Filtra la tarea con el ID dado más sus ancestros y descendientes.
+    Con max_depth solo se incluyen descendientes hasta ese nivel relativo.
+    """
+    return TaskHierarchy(tasks).select([task_id], max_depth)
+
+
+# =============================================================================
+# Lenguaje de filtros (--where)
+# =============================================================================
+# Ejemplo: nivel in (2,3) and estado != 'Completo' and inicio >= 2026-03-01
+#   campos:     id, nivel, nombre, estado, asignado, inicio, fin, avance, duracion, predecesores
+#   operadores: == (o =), !=, <, <=, >, >=, in (...), not in (...), ~ (regex, solo texto)
+#   lógica:     and, or, not, paréntesis
+# Textos entre comillas (o palabras sueltas) y sin distinguir mayúsculas; fechas
+# YYYY-MM-DD o dd/mm/YYYY; avance en % (0-100); duracion en días.
+# La expresión se compila una vez a un predicado sobre Task.
+_WHERE_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<date>\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{2,4})
+      | (?P<num>-?\d+(?:\.\d+)?)%?
+      | (?P<str>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|<=|>=|=|<|>|~|\(|\)|,)
+      | (?P<word>[^\W\d]\w*)
+    )""",
+    re.VERBOSE,
+)
+_WHERE_KEYWORDS = {"and", "or", "not", "in"}
+_WHERE_OPS: dict[str, Callable[[object, object], bool]] = {
+    "==": lambda a, b: a == b,
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _numeric_id(task: Task) -> int | None:
+    return task.id if isinstance(task.id, int) else None
+
+
+# campo -> (tipo, acceso)
+_WHERE_FIELDS: dict[str, tuple[str, Callable[[Task], object]]] = {
+    "id": ("num", _numeric_id),
+    "nivel": ("num", lambda t: t.level),
+    "nombre": ("text", lambda t: t.name),
+    "estado": ("text", lambda t: t.status),
+    "asignado": ("text", lambda t: t.assigned),
+    "inicio": ("date", lambda t: t.start),
+    "fin": ("date", lambda t: t.end),
+    "avance": ("num", lambda t: t.pct),
+    "duracion": ("num", lambda t: duration_days(t.duration)),
+    "predecesores": ("text", lambda t: t.pred),
+}
+
+
+def _tokenize_where(expr: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        m = _WHERE_TOKEN_RE.match(expr, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"carácter inesperado en posición {pos + 1}: {expr[pos:pos + 10]!r}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "str":
+            text = text[1:-1]
+        elif kind == "word" and text.lower() in _WHERE_KEYWORDS:
+            kind, text = "kw", text.lower()
+        tokens.append((kind, text))
+        pos = m.end()
+    return tokens
+
+
+class _WhereParser:
+    """Descenso recursivo: or > and > not > comparación."""
+
+    def __init__(self, expr: str) -> None:
+        self.tokens = _tokenize_where(expr)
+        self.pos = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, kind: str | None = None, text: str | None = None) -> tuple[str, str]:
+        tok = self.peek()
+        if tok is None or (kind and tok[0] != kind) or (text and tok[1] != text):
+            expected = text or kind or "un valor"
+            found = tok[1] if tok else "el final"
+            raise ValueError(f"se esperaba {expected!r} y se encontró {found!r}")
+        self.pos += 1
+        return tok
+
+    def accept(self, kind: str, text: str) -> bool:
+        if self.peek() == (kind, text):
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self) -> Callable[[Task], bool]:
+        pred = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError(f"sobra {self.peek()[1]!r} al final de la expresión")
+        return pred
+
+    def parse_or(self) -> Callable[[Task], bool]:
+        preds = [self.parse_and()]
+        while self.accept("kw", "or"):
+            preds.append(self.parse_and())
+        if len(preds) == 1:
+            return preds[0]
+        return lambda t: any(p(t) for p in preds)
+
+    def parse_and(self) -> Callable[[Task], bool]:
+        preds = [self.parse_not()]
+        while self.accept("kw", "and"):
+            preds.append(self.parse_not())
+        if len(preds) == 1:
+            return preds[0]
+        return lambda t: all(p(t) for p in preds)
+
+    def parse_not(self) -> Callable[[Task], bool]:
+        if self.accept("kw", "not"):
+            inner = self.parse_not()
+            return lambda t: not inner(t)
+        if self.accept("op", "("):
+            inner = self.parse_or()
+            self.take("op", ")")
+            return inner
+        return self.parse_comparison()
+
+    def literal(self, field: str, kind: str) -> object:
+        tok_kind, text = self.take()
+        if kind == "text":
+            if tok_kind in ("str", "word", "num", "date"):
+                return text
+        elif kind == "num":
+            if tok_kind == "num":
+                value = float(text)
+                return int(value) if value.is_integer() else value
+        elif kind == "date":
+            value = parse_date(text) if tok_kind in ("date", "str") else None
+            if value is not None:
+                return value
+        raise ValueError(f"valor inválido para {field}: {text!r}")
+
+    def parse_comparison(self) -> Callable[[Task], bool]:
+        _, field = self.take("word")
+        field = field.lower()
+        if field not in _WHERE_FIELDS:
+            raise ValueError(f"campo desconocido {field!r} (campos: {', '.join(_WHERE_FIELDS)})")
+        kind, getter = _WHERE_FIELDS[field]
+
+        negate = self.accept("kw", "not")
+        if negate or self.accept("kw", "in"):
+            if negate:
+                self.take("kw", "in")
+            self.take("op", "(")
+            values = [self.literal(field, kind)]
+            while self.accept("op", ","):
+                values.append(self.literal(field, kind))
+            self.take("op", ")")
+            if kind == "text":
+                options = {v.casefold() for v in values}
+                pred = lambda t: getter(t).casefold() in options
+            else:
+                options = set(values)
+                pred = lambda t: getter(t) in options
+            return (lambda t: not pred(t)) if negate else pred
+
+        _, op = self.take("op")
+        if op == "~":
+            if kind != "text":
+                raise ValueError(f"'~' solo aplica a campos de texto, no a {field}")
+            pattern = self.literal(field, kind)
+            try:
+                rx = re.compile(pattern, re.IGNORECASE)
+            except re.error as exc:
+                raise ValueError(f"regex inválida {pattern!r}: {exc}") from exc
+            return lambda t: rx.search(getter(t)) is not None
+        if op not in _WHERE_OPS:
+            raise ValueError(f"operador inválido {op!r} después de {field}")
+        cmp = _WHERE_OPS[op]
+        value = self.literal(field, kind)
+        if kind == "text":
+            folded = value.casefold()
+            return lambda t: cmp(getter(t).casefold(), folded)
+        # Sin valor (fecha/avance vacío) solo cumple '!='.
+        missing = op == "!="
+        return lambda t: missing if (v := getter(t)) is None else cmp(v, value)
+
+
+_WHERE_CACHE: dict[str, Callable[[Task], bool]] = {}
+
+
+def compile_filter(expr: str) -> Callable[[Task], bool]:
+    """Compila una expresión --where a un predicado Task -> bool (ValueError si es inválida)."""
+    pred = _WHERE_CACHE.get(expr)
+    if pred is None:
+        if not expr.strip():
+            raise ValueError("expresión vacía")
+        pred = _WHERE_CACHE[expr] = _WhereParser(expr).parse()
+    return pred
+
+
+def filter_by_expression(tasks: list[Task], expr: str) -> list[Task]:
+    """Filtra con una expresión --where en una pasada e incluye ancestros para contexto."""
+    return TaskHierarchy(tasks).matching(compile_filter(expr))
+
+
+class WorkbookSession:
+    """
+    Carga la tabla completa del XLSX una sola vez y la comparte entre pasos de filtro.
+    `full` es la vista completa (la que usa --expand) y `filtered` la vista actual.
+    """
+
+    MAX_INDEXES = 4
+
+    def __init__(self, path: Path, use_cache: bool = True) -> None:
+        self.path = path
+        self.use_cache = use_cache
+        self._sha256: str | None = None
+        self._full: list[Task] | None = None
+        self._filtered: list[Task] | None = None
+        self._indexes: OrderedDict[int, TaskHierarchy] = OrderedDict()
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = cached_sha256(self.path) if self.use_cache else compute_sha256(self.path)
+        return self._sha256
+
+    @property
+    def full(self) -> list[Task]:
+        if self._full is None:
+            self._full = load_tasks_cached(self.path, self.use_cache, self.sha256)
+        return self._full
+
+    @property
+    def filtered(self) -> list[Task]:
+        if self._filtered is None:
+            self._filtered = self.full
+        return self._filtered
+
+    @filtered.setter
+    def filtered(self, tasks: list[Task]) -> None:
+        self._filtered = tasks
+
+    def reset(self) -> list[Task]:
+        """Vuelve la vista filtrada a la tabla completa."""
+        self._filtered = self.full
+        return self._filtered
+
+    def index(self, tasks: list[Task] | None = None) -> TaskHierarchy:
+        """
+        Índice jerárquico de una vista (por defecto la completa). Se construye una
+        vez por vista; se guardan el de `full` y los de las últimas vistas usadas.
+        """
+        tasks = self.full if tasks is None else tasks
+        key = id(tasks)
+        idx = self._indexes.get(key)
+        if idx is None or idx.tasks is not tasks:
+            idx = self._indexes[key] = TaskHierarchy(tasks)
+        self._indexes.move_to_end(key)
+        full_key = id(self.full)
+        while len(self._indexes) > self.MAX_INDEXES:
+            oldest = next(k for k in self._indexes if k != full_key)
+            del self._indexes[oldest]
+        return idx
+
+    def apply(self, kind: str, value: list[int] | int | str, expand: bool = False) -> list[Task]:
+        """Aplica un paso (`nivel`, `id` o `where`) sobre la vista filtrada y la retorna."""
+        if kind == "nivel":
+            levels = value if isinstance(value, list) else [value]
+            if levels:
+                self._filtered = self.index(self.filtered).with_levels(levels)
+        elif kind == "id":
+            base = self.full if expand else self.filtered
+            depth = 1 if expand else None
+            ids = value if isinstance(value, list) else [value]
+            self._filtered = self.index(base).select([int(v) for v in ids], max_depth=depth)
+        elif kind == "where":
+            self._filtered = self.index(self.filtered).matching(compile_filter(str(value)))
+        else:
+            raise ValueError(f"Filtro desconocido: {kind}")
+        return self._filtered
+
+
+# =============================================================================
+# Tabla columnar de tareas (NumPy)
+# =============================================================================
+class TaskTable:
+    """
+    Vista columnar de una lista de Task para cálculos vectorizados: id y nivel
+    como enteros, inicio/fin como datetime64[D] (NaT si falta) y avance como
+    float (NaN si falta). La fila i corresponde a tasks[i].
+    """
+
+    __slots__ = ("tasks", "ids", "levels", "start", "end", "pct")
+
+    def __init__(self, tasks: list[Task]) -> None:
+        n = len(tasks)
+        self.tasks = tasks
+        self.ids = np.fromiter((t.id if isinstance(t.id, int) else -1 for t in tasks), dtype=np.int64, count=n)
+        self.levels = np.fromiter((t.level for t in tasks), dtype=np.int16, count=n)
+        self.start = np.array([t.start or "NaT" for t in tasks], dtype="datetime64[D]")
+        self.end = np.array([t.end or "NaT" for t in tasks], dtype="datetime64[D]")
+        self.pct = np.fromiter((np.nan if t.pct is None else t.pct for t in tasks), dtype=np.float64, count=n)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def span(self) -> tuple[date, date] | None:
+        """(inicio mínimo, fin máximo) de las tareas con fechas."""
+        starts = self.start[~np.isnat(self.start)]
+        ends = self.end[~np.isnat(self.end)]
+        if not len(starts) or not len(ends):
+            return None
+        return starts.min().item(), ends.max().item()
+
+    def mean_pct(self) -> float | None:
+        valid = self.pct[~np.isnan(self.pct)]
+        return float(valid.mean()) if len(valid) else None
+
+    def business_days(self, calendar: BusinessCalendar) -> np.ndarray:
+        """Días hábiles de cada tarea (inicio y fin inclusive); 0 si le faltan fechas."""
+        return calendar.count_many(self.start, self.end)
+
+    def planned_pct(self, today: date, calendar: BusinessCalendar | None = None) -> np.ndarray:
+        """
+        % planificado de cada tarea a la fecha, por días corridos entre inicio y fin;
+        con `calendar`, por días hábiles.
+        """
+        return self._planned(self.start, self.end, today, calendar)
+
+    @staticmethod
+    def _planned(start: np.ndarray, end: np.ndarray, today: date, calendar: BusinessCalendar | None) -> np.ndarray:
+        if calendar is not None:
+            return calendar.elapsed_fraction_many(start, end, today) * 100.0
+        t = np.datetime64(today, "D")
+        total = np.maximum(1, (end - start).astype(np.int64))
+        elapsed = (t - start).astype(np.int64)
+        return np.where(t < start, 0.0, np.where(t >= end, 100.0, elapsed / total * 100.0))
+
+    def planned_mean(
+        self, today: date, calendar: BusinessCalendar | None = None, spans: SpanIndex | None = None
+    ) -> float | None:
+        """
+        Promedio de planned_pct sobre las tareas con ambas fechas. Con `spans` (el
+        span_index() de esta tabla) la fracción solo se calcula para las tareas en
+        curso; las terminadas suman 100 y las por empezar 0.
+        """
+        dated = ~(np.isnat(self.start) | np.isnat(self.end))
+        total = int(np.count_nonzero(dated))
+        if not total:
+            return None
+        if spans is None:
+            return float(self.planned_pct(today, calendar)[dated].mean())
+        t = np.datetime64(today, "D")
+        running = np.array([pos for pos in spans.active(today) if self.end[pos] > t], dtype=np.int64)
+        partial = float(self._planned(self.start[running], self.end[running], today, calendar).sum())
+        # Fin < inicio (fuera del índice): 0 antes del inicio, 100 desde el inicio.
+        reversed_started = int(np.count_nonzero(dated & (self.end < self.start) & (self.start <= t)))
+        ended = int(spans.count_ended([today])[0])
+        return (100.0 * (ended + reversed_started) + partial) / total
+
+    def span_index(self) -> SpanIndex:
+        """Índice de intervalos sobre [inicio, fin]; las posiciones son filas de la tabla."""
+        return SpanIndex(self.start, self.end)
+
+    def start_groups(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Grupos contiguos por fecha de inicio (la tabla debe venir ordenada por inicio):
+        (fechas, índice de la primera tarea, cantidad de tareas).
+        """
+        return np.unique(self.start, return_index=True, return_counts=True)
+
+    def group_mean_pct(self, offsets: np.ndarray) -> np.ndarray:
+        """Promedio de avance por grupo contiguo; NaN si ninguna tarea del grupo tiene avance."""
+        if not len(offsets):
+            return np.zeros(0)
+        valid = ~np.isnan(self.pct)
+        sums = np.add.reduceat(np.where(valid, self.pct, 0.0), offsets)
+        counts = np.add.reduceat(valid.astype(np.int64), offsets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    @staticmethod
+    def positions(dates: np.ndarray, start_min: date, end_max: date, x_left: float, x_right: float) -> np.ndarray:
+        """Coordenada x de cada fecha sobre una línea [x_left, x_right] que cubre [start_min, end_max]."""
+        base = np.datetime64(start_min, "D")
+        total = (np.datetime64(end_max, "D") - base).astype(np.int64) or 1
+        ratio = (dates.astype("datetime64[D]") - base).astype(np.int64) / total
+        return x_left + (x_right - x_left) * ratio
+
+
+# =============================================================================
+# Serie diaria de la animación día a día (TLD)
+# =============================================================================
+TLD_DAYS_TARGET_PCT = 19.0
+
+
+def tld_window(now: date) -> tuple[date, date]:
+    """Ventana del avance día a día: del 6 de enero del año en curso a hoy."""
+    return date(now.year, 1, 6), now
+
+
+def adjusted_today(start_min: date, end_max: date, today: date | None = None) -> date:
+    """Hoy, llevado al año del Gantt solo si así cae dentro de su rango."""
+    today = today or date.today()
+    if today.year != start_min.year:
+        try:
+            candidate = today.replace(year=start_min.year)
+        except ValueError:
+            candidate = today.replace(year=start_min.year, day=28)
+        if start_min <= candidate <= end_max:
+            today = candidate
+    return today
+
+
+def progress_targets(
+    table: TaskTable, today: date, spans: SpanIndex | None = None
+) -> tuple[int | None, int | None]:
+    """
+    Promedio global de avance real y planificado (redondeados) a la fecha; con
+    `spans`, el planificado consulta el índice de tramos (TaskTable.planned_mean).
+    """
+    mean_real = table.mean_pct()
+    avg_all = round(mean_real) if mean_real is not None else None
+    mean_planned = table.planned_mean(today, spans=spans)
+    avg_planned = round(mean_planned) if mean_planned is not None else None
+    return avg_all, avg_planned
+
+
+def progress_series(tasks: list[Task], calendar: BusinessCalendar, now: date | None = None) -> DailySeries:
+    """La misma serie que anima GanttTimelineLevel2, para exportarla sin render."""
+    now = now or date.today()
+    dated = sorted((t for t in tasks if t.level >= 2 and t.start and t.end), key=lambda t: t.start)
+    table = TaskTable(dated)
+    start_min, end_max = table.span() if dated else (now, now)
+    spans = table.span_index()
+    avg_all, avg_planned = progress_targets(table, adjusted_today(start_min, end_max, now), spans)
+    start, end = tld_window(now)
+    return daily_series(calendar, start, end, avg_all or 0, avg_planned or 0, TLD_DAYS_TARGET_PCT, spans)
+
+
+# =============================================================================
+# Archivo binario de tareas (.gtasks)
+# =============================================================================
+# Layout (little-endian):
+#   cabecera  _GTASKS_HEADER: magic, versión, flags, n tareas, sha256 del XLSX
+#             (32 bytes crudos), largo de ruta fuente, largo de spec, largo de blob
+#   ruta del XLSX fuente y spec de filtros (UTF-8)
+#   n registros _GTASKS_RECORD de tamaño fijo
+#   blob UTF-8 con los textos (deduplicados), referenciados por (offset, largo)
+TASKS_BIN_SUFFIX = ".gtasks"
+_GTASKS_MAGIC = b"GTSK"
+_GTASKS_VERSION = 1
+_GTASKS_HEADER = struct.Struct("<4sHHI32sIII")
+# id, nivel, tipo de id (0 int, 1 texto, 2 vacío), inicio/fin (ordinal, 0 = sin fecha),
+# avance (NaN = sin avance) y 6 referencias (offset, largo): nombre, estado,
+# asignado, duración, predecesores, id en texto.
+_GTASKS_RECORD = struct.Struct("<qhBxiid12I")
+_ID_INT, _ID_TEXT, _ID_NONE = 0, 1, 2
+
+
+def write_tasks_bin(
+    tasks: list[Task],
+    output_path: Path,
+    source_sha256: str = "",
+    source: str = "",
+    spec: str = "",
+) -> None:
+    """Escribe tareas en formato .gtasks (escritura atómica)."""
+    blob = bytearray()
+    interned: dict[str, tuple[int, int]] = {}
+
+    def ref(text: str) -> tuple[int, int]:
+        hit = interned.get(text)
+        if hit is None:
+            data = text.encode("utf-8")
+            hit = interned[text] = (len(blob), len(data))
+            blob.extend(data)
+        return hit
+
+    records = bytearray()
+    for task in tasks:
+        if isinstance(task.id, int) and not isinstance(task.id, bool):
+            id_kind, id_num, id_text = _ID_INT, task.id, ""
+        elif task.id is None:
+            id_kind, id_num, id_text = _ID_NONE, 0, ""
+        else:
+            id_kind, id_num, id_text = _ID_TEXT, 0, str(task.id)
+        records += _GTASKS_RECORD.pack(
+            id_num,
+            task.level,
+            id_kind,
+            task.start.toordinal() if task.start else 0,
+            task.end.toordinal() if task.end else 0,
+            math.nan if task.pct is None else task.pct,
+            *ref(task.name),
+            *ref(task.status),
+            *ref(task.assigned),
+            *ref(task.duration),
+            *ref(task.pred),
+            *ref(id_text),
+        )
+
+    source_b = source.encode("utf-8")
+    spec_b = spec.encode("utf-8")
+    header = _GTASKS_HEADER.pack(
+        _GTASKS_MAGIC,
+        _GTASKS_VERSION,
+        0,
+        len(tasks),
+        bytes.fromhex(source_sha256) if source_sha256 else bytes(32),
+        len(source_b),
+        len(spec_b),
+        len(blob),
+    )
+    tmp = output_path.with_name(f"{output_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(header)
+            f.write(source_b)
+            f.write(spec_b)
+            f.write(records)
+            f.write(blob)
+        os.replace(tmp, output_path)
+    finally:
+        if tmp.exists():
+            os.remove(tmp)
+
+
+class TaskFile:
+    """
+    Lector de .gtasks sobre mmap: la cabecera (sha256, fuente, spec) se lee sin
+    tocar los registros, y cada tarea se decodifica solo al pedirla.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _GTASKS_HEADER.size:
+                raise ValueError(f"{path}: archivo .gtasks truncado")
+            magic, version, _flags, count, sha, source_len, spec_len, blob_len = _GTASKS_HEADER.unpack_from(self._mm, 0)
+            if magic != _GTASKS_MAGIC:
+                raise ValueError(f"{path}: no es un archivo .gtasks")
+            if version != _GTASKS_VERSION:
+                raise ValueError(f"{path}: versión .gtasks {version} no soportada (se espera {_GTASKS_VERSION})")
+            pos = _GTASKS_HEADER.size
+            self.count = count
+            self.source_sha256 = sha.hex() if any(sha) else ""
+            self.source = self._mm[pos:pos + source_len].decode("utf-8")
+            pos += source_len
+            self.spec = self._mm[pos:pos + spec_len].decode("utf-8")
+            pos += spec_len
+            self._records = pos
+            self._blob = pos + count * _GTASKS_RECORD.size
+            if self._blob + blob_len > len(self._mm):
+                raise ValueError(f"{path}: archivo .gtasks truncado")
+        except Exception:
+            self._mm.close()
+            raise
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> TaskFile:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self._blob + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def __getitem__(self, idx: int) -> Task:
+        if not 0 <= idx < self.count:
+            raise IndexError(idx)
+        (
+            id_num, level, id_kind, start, end, pct,
+            name_o, name_l, status_o, status_l, assigned_o, assigned_l,
+            dur_o, dur_l, pred_o, pred_l, id_o, id_l,
+        ) = _GTASKS_RECORD.unpack_from(self._mm, self._records + idx * _GTASKS_RECORD.size)
+        if id_kind == _ID_INT:
+            task_id = id_num
+        elif id_kind == _ID_TEXT:
+            task_id = self._text(id_o, id_l)
+        else:
+            task_id = None
+        return Task(
+            task_id,
+            level,
+            self._text(name_o, name_l),
+            self._text(status_o, status_l),
+            self._text(assigned_o, assigned_l),
+            date.fromordinal(start) if start else None,
+            date.fromordinal(end) if end else None,
+            None if math.isnan(pct) else pct,
+            self._text(dur_o, dur_l),
+            self._text(pred_o, pred_l),
+        )
+
+    def tasks(self) -> list[Task]:
+        return [self[i] for i in range(self.count)]
+
+    def is_fresh(self, xlsx_path: Path | None = None) -> bool | None:
+        """
+        Compara el sha256 de la cabecera con el XLSX actual (por defecto, la fuente
+        registrada). None si no hay con qué comparar.
+        """
+        path = xlsx_path or (Path(self.source) if self.source else None)
+        if not self.source_sha256 or path is None or not path.exists():
+            return None
+        return cached_sha256(path) == self.source_sha256
+
+
+def get_tasks_for_render() -> list[Task]:
+    """
+    Lee las tareas generadas por el CLI: filter_gantt.gtasks si existe y no es más
+    antiguo que filter_gantt.tasks; si no, el archivo de texto. GANTT_TASKS permite
+    apuntar a otra salida (p. ej. filter_gantt_id6.tasks del modo lote).
+    """
+    tasks_file = Path(os.environ.get("GANTT_TASKS", Path(__file__).with_name("filter_gantt.tasks")))
+    bin_file = tasks_file.with_suffix(TASKS_BIN_SUFFIX)
+    if bin_file.exists() and (not tasks_file.exists() or bin_file.stat().st_mtime >= tasks_file.stat().st_mtime):
+        with TaskFile(bin_file) as tf:
+            if tf.is_fresh() is False:
+                print(
+                    f"Aviso: {tf.source} cambió desde que se generó {bin_file.name} "
+                    f"(filtro: {tf.spec or 'sin filtro'}). Vuelve a ejecutar el CLI.",
+                    file=sys.stderr,
+                )
+            return tf.tasks()
+    if not tasks_file.exists():
+        raise FileNotFoundError(
+            f"No se encontró {tasks_file}. "
+            "Ejecuta primero el CLI para generar filter_gantt.tasks."
+        )
+    return load_tasks_from_file(tasks_file)
+
+
+def load_tasks_from_file(path: Path) -> list[Task]:
+    text = path.read_text(encoding="utf-8").lstrip()
+    module = ast.parse(text)
+    for node in module.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "tasks":
+                    return [Task.from_row(row) for row in ast.literal_eval(node.value)]
+    raise ValueError("tasks list not found in file")
+
+
+def write_tasks_file(tasks: list[Task], output_path: Path) -> None:
+    with output_path.open("w", encoding="utf-8") as f:
+        f.write("tasks = [\n")
+        for task in tasks:
+            f.write(f"    {task.to_row()},\n")
+        f.write("]\n")
+
+
+# =============================================================================
+# CLI standalone (python gantt_timeline_v2.py -xlsx ... --nivel ...)
+# =============================================================================
+def filter_cache() -> TaskCache:
+    return TaskCache(
+        CACHE_DIR / "filters",
+        max_entries=FILTER_CACHE_MAX_ENTRIES,
+        max_bytes=FILTER_CACHE_MAX_BYTES,
+    )
+
+
+def filter_cache_key(workbook_sha256: str, spec: str) -> str:
+    """Clave del resultado: sha256 del XLSX + cadena de filtros normalizada (incluye --expand)."""
+    return hashlib.sha256(f"{workbook_sha256}\n{spec}".encode("utf-8")).hexdigest()
+
+
+def write_task_outputs(tasks: list[Task], output: Path, session: WorkbookSession, spec: str) -> Path:
+    """Escribe la salida de texto y su .gtasks (con sha256 del XLSX y spec); retorna el .gtasks."""
+    write_tasks_file(tasks, output)
+    bin_output = output.with_suffix(TASKS_BIN_SUFFIX)
+    write_tasks_bin(
+        tasks,
+        bin_output,
+        source_sha256=session.sha256,
+        source=str(session.path.resolve()),
+        spec=spec,
+    )
+    return bin_output
+
+
+def batch_requested(args: argparse.Namespace) -> bool:
+    return bool(args.batch_ids or args.batch_spec or args.batch_nivel is not None)
+
+
+def batch_items(args: argparse.Namespace, session: WorkbookSession) -> list[tuple[str, list[list[str]]]]:
+    """
+    Arma los pasos del modo lote como (etiqueta, segmentos): uno por ID de
+    --batch-ids / --batch-nivel y uno por cada --batch-spec.
+    """
+    ids: list[int] = []
+    for raw in args.batch_ids or []:
+        try:
+            ids.extend(int(p.strip()) for p in raw.split(",") if p.strip())
+        except ValueError as exc:
+            raise SystemExit("Error: --batch-ids requiere enteros separados por coma.") from exc
+    if args.batch_nivel is not None:
+        idx = session.index(session.filtered)
+        ids.extend(
+            idx.tasks[pos].id
+            for pos in idx.by_level.get(args.batch_nivel, ())
+            if isinstance(idx.tasks[pos].id, int)
+        )
+    items = [(f"id{task_id}", [["--id", str(task_id)]]) for task_id in dict.fromkeys(ids)]
+    for n, spec in enumerate(args.batch_spec or [], start=1):
+        items.append((f"spec{n}", split_by_pipe(shlex.split(spec))))
+    return items
+
+
+def print_cpm_report(model: ScheduleModel, view: list[Task]) -> None:
+    """Imprime fin del proyecto, ruta crítica y fechas CPM de las tareas de la vista."""
+    finish = model.project_finish()
+    print(
+        f"CPM: {len(model)} tareas, {model.link_count} vínculos; "
+        f"fin temprano {finish.strftime('%d/%m/%y') if finish else '-'}"
+    )
+    for task_id, ref in model.missing:
+        print(f"  Aviso: la tarea {task_id} referencia el predecesor {ref}, que no es una tarea de detalle")
+    print("Ruta crítica: " + " -> ".join(str(i) for i in model.critical_path()))
+    print("id | inicio temprano | fin temprano | inicio tardío | fin tardío | holgura | título")
+    for task in view:
+        if task.id not in model.pos:
+            continue
+        es, ef = model.early_dates(task.id)
+        ls, lf = model.late_dates(task.id)
+        slack = model.total_float(task.id)
+        mark = " *" if slack <= 0 else ""
+        print(
+            f"- {task.id} | {es:%d/%m/%y} | {ef:%d/%m/%y} | {ls:%d/%m/%y} | {lf:%d/%m/%y} | "
+            f"{slack}d{mark} | {task.name}"
+        )
+
+
+# Los cambios se separan solo por la coma que precede a "campo=": así
+# 'duracion=1,5d' conserva su coma decimal.
+_WHAT_IF_SPLIT_RE = re.compile(r",(?=\s*[^\W\d]\w*\s*=)")
+
+
+def parse_what_if(spec: str) -> tuple[int, date | None, int | None]:
+    """'58:duracion=3d' / '8:inicio=2026-03-02' / '58:duracion=1,5d,inicio=02/03/2026'."""
+    task_ref, sep, changes = spec.partition(":")
+    start = duration = None
+    try:
+        task_id = int(task_ref.strip())
+        if not sep or not changes.strip():
+            raise ValueError
+        for change in _WHAT_IF_SPLIT_RE.split(changes):
+            field, _, value = change.partition("=")
+            field = field.strip().lower()
+            if field == "inicio":
+                start = parse_date(value.strip())
+                if start is None:
+                    raise ValueError
+            elif field == "duracion":
+                days = duration_days(value)
+                if days is None:
+                    raise ValueError
+                duration = math.ceil(days)
+            else:
+                raise ValueError
+    except ValueError as exc:
+        raise SystemExit(
+            f"Error: --what-if {spec!r}; usa ID:duracion=N o ID:inicio=YYYY-MM-DD."
+        ) from exc
+    return task_id, start, duration
+
+
+def print_what_if(model: ScheduleModel, specs: list[str], tasks: list[Task]) -> int:
+    """Aplica los cambios en orden (recálculo incremental) e imprime las tareas movidas."""
+    names = {task.id: task.name for task in tasks}
+    finish_before = model.project_finish()
+    for spec in specs:
+        task_id, start, duration = parse_what_if(spec)
+        started = time.perf_counter()
+        try:
+            moved = model.update(task_id, start=start, duration=duration)
+        except (KeyError, ValueError) as exc:
+            print(f"Error: --what-if {spec!r}: {exc.args[0]}", file=sys.stderr)
+            return 1
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Qué pasa si {spec}: {len(moved)} tareas movidas ({elapsed:.2f} ms)")
+        for moved_id, (d_start, d_end) in moved.items():
+            print(f"- {moved_id} | inicio {d_start:+d}d | fin {d_end:+d}d | {names.get(moved_id, '')}")
+    finish_after = model.project_finish()
+    if finish_before and finish_after:
+        print(f"Fin temprano: {finish_before:%d/%m/%y} -> {finish_after:%d/%m/%y}")
+    return 0
+
+
+def run_filter_cli() -> int:
+    """CLI para generar filter_gantt.tasks desde XLSX."""
+    parser = argparse.ArgumentParser(
+        description="Genera filter_gantt.tasks desde XLSX o renderiza con Manim."
+    )
+    parser.add_argument("-xlsx", "--xlsx", required=True, type=Path, help="Ruta al archivo XLSX.")
+    parser.add_argument(
+        "--expand",
+        action="store_true",
+        help="Al usar --id, expande solo el siguiente nivel del ID desde el XLSX completo.",
+    )
+    parser.add_argument(
+        "-debug",
+        "--debug",
+        action="store_true",
+        help="Imprime un informe breve del filtro (IDs/niveles/títulos) y vuelca cada segmento intermedio en /tmp.",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=Path(__file__).with_name("filter_gantt.tasks"),
+        help="Archivo de salida (default: filter_gantt.tasks).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usa las caches (.cache/xlsx y .cache/filters); siempre lee el XLSX y aplica los filtros.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Vacía la cache del XLSX parseado y la de resultados de filtros antes de leer.",
+    )
+    parser.add_argument(
+        "--cpm",
+        action="store_true",
+        help="Imprime la ruta crítica (CPM sobre Predecesores, días hábiles) para las tareas filtradas.",
+    )
+    parser.add_argument(
+        "--rollup",
+        action="store_true",
+        help="Recalcula fechas y avance de las filas resumen desde sus hijas (avance ponderado por duración).",
+    )
+    parser.add_argument(
+        "--calendario",
+        help="Feriados a usar en --cpm/--what-if/--serie-diaria (ej: CL o CL,PE; default: run_gantt_pipeline.parametros o CL).",
+    )
+    parser.add_argument(
+        "--serie-diaria",
+        type=Path,
+        help="Escribe en este CSV la serie día a día de la animación (días hábiles, real %%, plan %%, días %%).",
+    )
+    parser.add_argument(
+        "--what-if",
+        action="append",
+        help=(
+            "Recalcula el plan si cambia una tarea (ej: 58:duracion=3d o 8:inicio=2026-03-02) "
+            "e imprime las tareas que se mueven; repetible, se aplica en orden."
+        ),
+    )
+    parser.add_argument(
+        "--batch-ids",
+        action="append",
+        help="Modo lote: un archivo por ID (ej: 3,6,17), escrito como <salida>_id<N>.tasks.",
+    )
+    parser.add_argument(
+        "--batch-nivel",
+        type=int,
+        help="Modo lote: un archivo por cada tarea de este nivel (ej: 2 para los paquetes de trabajo).",
+    )
+    parser.add_argument(
+        "--batch-spec",
+        action="append",
+        help="Modo lote: un archivo por cadena de filtros (ej: \"--nivel 2 | --id 6\"), escrito como <salida>_spec<N>.tasks.",
+    )
+    args, _unknown = parser.parse_known_args()
+    segments = split_by_pipe(sys.argv[1:])
+
+    if not args.xlsx.exists():
+        print(f"Error: no existe el archivo {args.xlsx}", file=sys.stderr)
+        return 1
+
+    if args.clear_cache:
+        TaskCache(CACHE_DIR / "xlsx").clear()
+        filter_cache().clear()
+    session = WorkbookSession(args.xlsx, use_cache=not args.no_cache)
+    spec = describe_filter_spec(segments, args.expand)
+    if args.rollup:
+        spec = f"{spec} --rollup".strip()
+
+    # Resultado memorizado: misma cadena de filtros sobre el mismo XLSX. Se omite
+    # con --debug (que necesita los pasos), con --cpm/--what-if/--serie-diaria y en modo lote.
+    memo_key = None
+    extra_reports = args.cpm or args.what_if or args.serie_diaria
+    if not args.no_cache and not args.debug and not extra_reports and not batch_requested(args):
+        memo_key = filter_cache_key(session.sha256, spec)
+        records = filter_cache().get(memo_key)
+        if records is not None:
+            filtered = [Task.from_record(rec) for rec in records]
+            print(f"Filtro en cache ({spec or 'sin filtro'}): {len(filtered)} tareas")
+            bin_output = write_task_outputs(filtered, args.output, session, spec)
+            print(f"Escrito: {args.output}")
+            print(f"Escrito: {bin_output}")
+            return 0
+
+    filtered = session.filtered
+
+    # Los segmentos se encadenan en memoria: cada etapa parte de session.filtered.
+    # Solo con --debug se vuelca cada segmento intermedio a /tmp para inspeccionarlo.
+    for seg_idx, seg in enumerate(segments):
+        filter_seq = parse_filter_sequence(seg)
+        if filter_seq:
+            for kind, value in filter_seq:
+                filtered = session.apply(kind, value, expand=args.expand)
+                if kind == "nivel":
+                    print(f"Filtrado por nivel {value}: {len(filtered)} tareas")
+                elif kind == "id":
+                    print(f"Filtrado por ID {value}: {len(filtered)} tareas")
+                elif kind == "where":
+                    print(f"Filtrado por expresión {value!r}: {len(filtered)} tareas")
+        else:
+            if seg_idx == 0:
+                print(f"Sin filtro: {len(filtered)} tareas")
+
+        if args.debug and seg_idx < len(segments) - 1:
+            dump = Path("/tmp") / f"gantt_filter_{uuid.uuid4().hex}_{seg_idx}.tasks"
+            write_tasks_file(filtered, dump)
+            print(f"Segmento {seg_idx + 1}: {dump}")
+
+    if args.debug:
+        levels = sorted({task.level for task in filtered})
+        print(f"Niveles presentes: {levels}")
+        print("Tareas filtradas (id | nivel | título):")
+        for task in filtered:
+            print(f"- {task.id} | {task.level} | {task.name}")
+
+    if args.cpm or args.what_if:
+        try:
+            calendar = project_calendar(args.calendario)
+            model = ScheduleModel(session.full, calendar)
+            if len(model):
+                warn_missing_years(calendar, model.origin, model.project_finish(), f"{resolve_calendar_spec(args.calendario)} ")
+        except (ScheduleCycleError, ValueError) as exc:
+            print(f"Error CPM: {exc}", file=sys.stderr)
+            return 1
+        if args.what_if and print_what_if(model, args.what_if, session.full) != 0:
+            return 1
+        if args.cpm:
+            print_cpm_report(model, filtered)
+
+    rolled: dict[int, Task] = {}
+    if args.rollup:
+        rolled = rollup_tasks(session.full, session.index())
+        changed = 0
+        for task in filtered:
+            copy = rolled.get(id(task))
+            if copy is not None and (copy.start, copy.end, copy.pct) != (task.start, task.end, task.pct):
+                changed += 1
+                if args.debug:
+                    print(
+                        f"Rollup {task.id}: {task.start_str}-{task.end_str} {task.pct_str} -> "
+                        f"{copy.start_str}-{copy.end_str} {copy.pct_str}"
+                    )
+        filtered = [rolled.get(id(task), task) for task in filtered]
+        print(f"Rollup de resúmenes: {changed} filas cambian")
+
+    if args.serie_diaria:
+        calendar = project_calendar(args.calendario)
+        series = progress_series(filtered, calendar)
+        warn_missing_years(calendar, series.date(0), series.date(len(series) - 1), f"{resolve_calendar_spec(args.calendario)} ")
+        series.write_csv(args.serie_diaria)
+        print(f"Serie diaria: {len(series)} días, {series.days_total} hábiles -> {args.serie_diaria}")
+
+    items = batch_items(args, session)
+    if not items:
+        if memo_key is not None:
+            filter_cache().put(memo_key, [task.to_record() for task in filtered])
+        bin_output = write_task_outputs(filtered, args.output, session, spec)
+        print(f"Escrito: {args.output}")
+        print(f"Escrito: {bin_output}")
+        return 0
+
+    # Modo lote: todas las salidas parten de la misma vista y comparten la carga
+    # del XLSX y los índices jerárquicos de la sesión.
+    view = filtered
+    for label, item_segments in items:
+        session.filtered = view
+        result = view
+        for seg in item_segments:
+            for kind, value in parse_filter_sequence(seg):
+                result = session.apply(kind, value, expand=args.expand)
+        result = [rolled.get(id(task), task) for task in result]
+        output = args.output.with_name(f"{args.output.stem}_{label}{args.output.suffix}")
+        item_spec = describe_filter_spec(segments + item_segments, args.expand)
+        if args.rollup:
+            item_spec = f"{item_spec} --rollup".strip()
+        write_task_outputs(result, output, session, item_spec)
+        print(f"Lote {label}: {len(result)} tareas -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_filter_cli())
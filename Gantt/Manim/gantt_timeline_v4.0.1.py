@@ -1,414 +1,319 @@
 from __future__ import annotations
 
-import argparse
-import ast
-import sys
-import textwrap
-from collections import OrderedDict
-from datetime import datetime, timedelta, date
-from pathlib import Path
-import uuid
 import os
 import random
+from collections import OrderedDict
+from datetime import datetime, date
 
+import numpy as np
 from manim import *
-from openpyxl import load_workbook
+
+from gantt_calendar import warn_missing_years
+from gantt_progress import daily_series
+# Lectores, filtros y CLI viven en gantt_tasks (sin Manim); aquí solo lo que usan las escenas.
+from gantt_tasks import (
+    TLD_DAYS_TARGET_PCT,
+    TaskTable,
+    adjusted_today,
+    get_tasks_for_render,
+    progress_targets,
+    project_calendar,
+    resolve_calendar_spec,
+    run_filter_cli,
+    tld_window,
+)
 
 
 # =============================================================================
-# Funciones auxiliares
+# Mobjects reutilizables
 # =============================================================================
-def format_date(value) -> str:
-    if isinstance(value, datetime):
-        return value.strftime("%d/%m/%y")
-    if value is None:
-        return ""
-    text = str(value).strip()
-    if not text:
-        return ""
-    for fmt in ("%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(text, fmt).strftime("%d/%m/%y")
-        except ValueError:
-            continue
-    return text
-
-
-def format_percent(value) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, (int, float)):
-        pct = value * 100 if 0 <= value <= 1 else value
-        return f"{int(round(pct))}%"
-    text = str(value).strip()
-    if not text:
-        return ""
-    return text if "%" in text else f"{text}%"
-
-
-def _as_date(value):
-    if isinstance(value, datetime):
-        return value.date()
-    return value
-
-
-def business_days_in_span(start_date, end_date):
-    """Return business days in (start_date, end_date] excluding Sat/Sun."""
-    start_d = _as_date(start_date)
-    end_d = _as_date(end_date)
-    days = []
-    total = (end_d - start_d).days
-    for i in range(1, total + 1):
-        d = start_d + timedelta(days=i)
-        if d.weekday() < 5:
-            days.append(d)
-    return days
-
-
-HOLIDAYS_2026 = {
-    date(2026, 1, 1),
-    date(2026, 4, 3),
-    date(2026, 4, 4),
-    date(2026, 5, 1),
-    date(2026, 5, 21),
-    date(2026, 6, 21),
-    date(2026, 6, 29),
-    date(2026, 7, 16),
-    date(2026, 8, 15),
-    date(2026, 9, 18),
-    date(2026, 9, 19),
-    date(2026, 10, 12),
-    date(2026, 10, 31),
-    date(2026, 11, 1),
-    date(2026, 12, 8),
-    date(2026, 12, 25),
-}
-
-
-def holidays_in_span(start_date, end_date, holidays):
-    """Return holidays in (start_date, end_date] that fall on weekdays."""
-    start_d = _as_date(start_date)
-    end_d = _as_date(end_date)
-    days = []
-    total = (end_d - start_d).days
-    for i in range(1, total + 1):
-        d = start_d + timedelta(days=i)
-        if d in holidays and d.weekday() < 5:
-            days.append(d)
-    return days
-
-
-def business_days_count(start_date, end_date, holidays):
-    start_d = _as_date(start_date)
-    end_d = _as_date(end_date)
-    if end_d < start_d:
-        return 0
-    count = 0
-    cur = start_d
-    while cur <= end_d:
-        if cur.weekday() < 5 and cur not in holidays:
-            count += 1
-        cur += timedelta(days=1)
-    return count
-
-
-def load_tasks_from_xlsx(path: Path) -> list[list]:
-    wb = load_workbook(path, read_only=False, data_only=True)
-    ws = wb[wb.sheetnames[0]]
-
-    header_row = next(ws.iter_rows(min_row=1, max_row=1))
-    headers = [cell.value for cell in header_row]
-    header_map = {str(val).strip().lower(): idx for idx, val in enumerate(headers, start=1) if val}
-
-    def col_index(*names: str) -> int | None:
-        for name in names:
-            key = name.strip().lower()
-            if key in header_map:
-                return header_map[key]
-        return None
-
-    col_id = col_index("id", "uid", "uid ")
-    col_name = col_index("nombre de la tarea", "nombre", "task name", "name")
-    col_status = col_index("estado", "status")
-    col_assigned = col_index("asignado a", "asignado", "assigned")
-    col_start = col_index("fecha de inicio", "inicio", "start", "start date")
-    col_end = col_index("fecha de finalización", "fecha de finalizacion", "fin", "finish", "end", "end date")
-    col_pct = col_index("porcentaje completo", "% completo", "avance", "percent complete", "percentcomplete")
-    col_duration = col_index("duración", "duracion", "duration")
-    col_pred = col_index("predecesores", "predecessors", "pred")
-
-    if not col_name:
-        raise ValueError("No se encontro la columna 'Nombre de la tarea' en el XLSX.")
-
-    tasks = []
-    for row_idx in range(2, ws.max_row + 1):
-        name_cell = ws.cell(row=row_idx, column=col_name)
-        name_val = name_cell.value
-        if name_val is None or str(name_val).strip() == "":
-            continue
-
-        indent = name_cell.alignment.indent or 0
-        level = int(indent)
-
-        task_id = ws.cell(row=row_idx, column=col_id).value if col_id else row_idx - 1
-        status = ws.cell(row=row_idx, column=col_status).value if col_status else ""
-        assigned = ws.cell(row=row_idx, column=col_assigned).value if col_assigned else ""
-        start = ws.cell(row=row_idx, column=col_start).value if col_start else ""
-        end = ws.cell(row=row_idx, column=col_end).value if col_end else ""
-        pct = ws.cell(row=row_idx, column=col_pct).value if col_pct else ""
-        duration = ws.cell(row=row_idx, column=col_duration).value if col_duration else ""
-        pred = ws.cell(row=row_idx, column=col_pred).value if col_pred else ""
-
-        if isinstance(task_id, float) and task_id.is_integer():
-            task_id = int(task_id)
-
-        tasks.append(
-            [
-                task_id,
-                level,
-                str(name_val).strip(),
-                str(status).strip() if status is not None else "",
-                str(assigned).strip() if assigned is not None else "",
-                format_date(start),
-                format_date(end),
-                format_percent(pct),
-                str(duration).strip() if duration is not None else "",
-                str(pred).strip() if pred is not None else "",
-            ]
-        )
-
-    return tasks
-
-
-def _parse_levels(values: list[str] | None) -> list[int]:
-    if not values:
-        return []
-    levels: list[int] = []
-    for raw in values:
-        parts = [p.strip() for p in raw.split(",") if p.strip()]
-        for part in parts:
-            levels.append(int(part))
-    return levels
-
-
-def filter_by_levels(tasks: list[list], levels: list[int]) -> list[list]:
-    """Filtra por niveles e incluye ancestros para dar contexto visual."""
-    if not levels:
-        return tasks
-    level_set = set(levels)
-    result: list[list] = []
-    seen: set[tuple] = set()
-    stack: list[list] = []
-
-    for row in tasks:
-        level = row[1]
-        while stack and stack[-1][1] >= level:
-            stack.pop()
-        stack.append(row)
-
-        if level in level_set:
-            # Incluir ancestros y la fila actual sin duplicados.
-            for parent in stack:
-                key = tuple(parent)
-                if key not in seen:
-                    result.append(parent)
-                    seen.add(key)
-
-    return result
-
-
-def parse_filter_sequence(argv: list[str]) -> list[tuple[str, list[int] | int]]:
-    """Parsea --nivel/--id en el orden recibido para aplicar filtros anidados."""
-    seq: list[tuple[str, list[int] | int]] = []
-    i = 0
-    while i < len(argv):
-        arg = argv[i]
-        if arg == "--nivel":
-            if i + 1 >= len(argv):
-                raise SystemExit("Error: --nivel requiere un valor.")
-            levels = _parse_levels([argv[i + 1]])
-            seq.append(("nivel", levels))
-            i += 2
-            continue
-        if arg == "--id":
-            if i + 1 >= len(argv):
-                raise SystemExit("Error: --id requiere un valor.")
-            try:
-                task_id = int(argv[i + 1])
-            except ValueError as exc:
-                raise SystemExit("Error: --id requiere un entero.") from exc
-            seq.append(("id", task_id))
-            i += 2
-            continue
-        i += 1
-    return seq
-
-
-def split_by_pipe(argv: list[str]) -> list[list[str]]:
-    """Divide argumentos en segmentos separados por '|'."""
-    segments: list[list[str]] = []
-    current: list[str] = []
-    for arg in argv:
-        if arg == "|":
-            segments.append(current)
-            current = []
-        else:
-            current.append(arg)
-    segments.append(current)
-    return segments
-
-
-def filter_by_id_with_context(tasks: list[list], task_id: int, max_depth: int | None = None) -> list[list]:
+class FlipCounter(VGroup):
     """
-    Filtra la tarea con el ID dado más sus hijos directos.
-    Retorna la tarea padre y todas las tareas con nivel mayor hasta encontrar
-    otra tarea del mismo nivel o menor.
+    Contador tipo reloj de aeropuerto: etiqueta, caja partida y un glifo por
+    carácter. Los glifos se renderizan una sola vez por (carácter, tamaño) y se
+    comparten entre contadores; cambiar el valor solo copia y mueve glifos.
     """
-    result: list[list] = []
-    seen: set[tuple] = set()
-    stack: list[list] = []
-
-    found_idx = None
-    parent_level = None
-
-    for idx, row in enumerate(tasks):
-        level = row[1]
-        while stack and stack[-1][1] >= level:
-            stack.pop()
-        stack.append(row)
-        if row[0] == task_id:
-            found_idx = idx
-            parent_level = level
-            for parent in stack:
-                key = tuple(parent)
-                if key not in seen:
-                    result.append(parent)
-                    seen.add(key)
-            break
-
-    if found_idx is None or parent_level is None:
-        return []
-
-    # Agregar hijos (nivel > parent_level) hasta encontrar mismo nivel o menor
-    for row in tasks[found_idx + 1:]:
-        if row[1] <= parent_level:
-            break
-        if max_depth is not None and row[1] > parent_level + max_depth:
-            continue
-        key = tuple(row)
-        if key not in seen:
-            result.append(row)
-            seen.add(key)
-
-    return result
-
-
-def get_tasks_for_render() -> list[list]:
-    """Lee tareas desde filter_gantt.tasks (generado por el CLI)."""
-    tasks_file = Path(__file__).with_name("filter_gantt.tasks")
-    if not tasks_file.exists():
-        raise FileNotFoundError(
-            f"No se encontró {tasks_file}. "
-            "Ejecuta primero el CLI para generar filter_gantt.tasks."
-        )
-    return load_tasks_from_file(tasks_file)
-
-
-def load_tasks_from_file(path: Path) -> list[list]:
-    text = path.read_text(encoding="utf-8").lstrip()
-    module = ast.parse(text)
-    for node in module.body:
-        if isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name) and target.id == "tasks":
-                    return ast.literal_eval(node.value)
-    raise ValueError("tasks list not found in file")
-
 
-def write_tasks_file(tasks: list[list], output_path: Path) -> None:
-    with output_path.open("w", encoding="utf-8") as f:
-        f.write("tasks = [\n")
-        for row in tasks:
-            f.write(f"    {row},\n")
-        f.write("]\n")
-
-
-# =============================================================================
-# CLI standalone (python gantt_timeline_v2.py -xlsx ... --nivel ...)
-# =============================================================================
-def run_filter_cli() -> int:
-    """CLI para generar filter_gantt.tasks desde XLSX."""
-    parser = argparse.ArgumentParser(
-        description="Genera filter_gantt.tasks desde XLSX o renderiza con Manim."
-    )
-    parser.add_argument("-xlsx", "--xlsx", required=True, type=Path, help="Ruta al archivo XLSX.")
-    parser.add_argument(
-        "--expand",
-        action="store_true",
-        help="Al usar --id, expande solo el siguiente nivel del ID desde el XLSX completo.",
-    )
-    parser.add_argument(
-        "-debug",
-        "--debug",
-        action="store_true",
-        help="Imprime un informe breve del filtro (IDs/niveles/títulos).",
-    )
-    parser.add_argument(
-        "-o", "--output",
-        type=Path,
-        default=Path(__file__).with_name("filter_gantt.tasks"),
-        help="Archivo de salida (default: filter_gantt.tasks).",
-    )
-    args, _unknown = parser.parse_known_args()
-    segments = split_by_pipe(sys.argv[1:])
-
-    if not args.xlsx.exists():
-        print(f"Error: no existe el archivo {args.xlsx}", file=sys.stderr)
-        return 1
-
-    filtered = load_tasks_from_xlsx(args.xlsx)
-    temp_files: list[Path] = []
-
-    for seg_idx, seg in enumerate(segments):
-        filter_seq = parse_filter_sequence(seg)
-        if filter_seq:
-            for kind, value in filter_seq:
-                if kind == "nivel":
-                    filtered = filter_by_levels(
-                        filtered, value if isinstance(value, list) else [value]
-                    )
-                    print(f"Filtrado por nivel {value}: {len(filtered)} tareas")
-                elif kind == "id":
-                    base = load_tasks_from_xlsx(args.xlsx) if args.expand else filtered
-                    depth = 1 if args.expand else None
-                    filtered = filter_by_id_with_context(base, int(value), max_depth=depth)
-                    print(f"Filtrado por ID {value}: {len(filtered)} tareas")
+    _glyphs: dict[tuple[str, float], Text] = {}
+    _advances: dict[float, float] = {}
+    FONT = "DejaVu Sans Mono"
+
+    def __init__(
+        self,
+        label: str,
+        value: str,
+        width: float,
+        height: float,
+        scale: float = 1.0,
+        font_size: float = 16,
+        dot_color: ManimColor | None = None,
+    ) -> None:
+        super().__init__()
+        self.font_size = font_size * scale
+        self.drop = 0.12 * scale
+        box = RoundedRectangle(
+            width=width,
+            height=height,
+            corner_radius=0.05 * scale,
+            stroke_width=1,
+            stroke_color=GRAY_D,
+            fill_color=BLACK,
+            fill_opacity=0.35,
+        )
+        # División central y mitades con leve contraste (geometría fija, no se copia al cambiar)
+        mid_y = box.get_center()[1]
+        split_line = Line(
+            [box.get_left()[0], mid_y, 0],
+            [box.get_right()[0], mid_y, 0],
+            color=GRAY_C,
+            stroke_width=1,
+            stroke_opacity=0.6,
+        )
+        top_mask = Rectangle(width=width, height=height / 2, stroke_width=0, fill_color=BLACK, fill_opacity=0.22)
+        top_mask.move_to([box.get_center()[0], mid_y + height / 4, 0])
+        bottom_mask = Rectangle(width=width, height=height / 2, stroke_width=0, fill_color=BLACK, fill_opacity=0.38)
+        bottom_mask.move_to([box.get_center()[0], mid_y - height / 4, 0])
+        self.card = VGroup(box, top_mask, bottom_mask, split_line)
+
+        label_text: VMobject = Text(label, font_size=6 * scale, color=GRAY_B)
+        label_text.next_to(box, UP, buff=0.05 * scale)
+        if dot_color is not None:
+            dot = Dot(label_text.get_left() + LEFT * 0.06 * scale, radius=0.04 * scale, color=dot_color)
+            label_text = VGroup(dot, label_text)
+        self.label = label_text
+
+        self.value = value
+        self.digits = VGroup(*[self._glyph_at(ch, i, len(value)) for i, ch in enumerate(value)])
+        self._leaving: list[VMobject] = []
+        self.add(self.label, self.card, self.digits)
+
+    @classmethod
+    def _template(cls, ch: str, font_size: float) -> Text:
+        key = (ch, font_size)
+        glyph = cls._glyphs.get(key)
+        if glyph is None:
+            glyph = Text(ch, font_size=font_size, weight=BOLD, color=WHITE, font=cls.FONT)
+            cls._glyphs[key] = glyph
+        return glyph
+
+    @classmethod
+    def _advance(cls, font_size: float) -> float:
+        """Avance horizontal de un carácter (fuente monoespaciada)."""
+        adv = cls._advances.get(font_size)
+        if adv is None:
+            two = Text("00", font_size=font_size, weight=BOLD, font=cls.FONT)
+            adv = two.width - cls._template("0", font_size).width
+            cls._advances[font_size] = adv
+        return adv
+
+    def _glyph_at(self, ch: str, index: int, count: int) -> VMobject:
+        """Copia del glifo cacheado ubicada en la posición `index` de `count` caracteres."""
+        box = self.card[0]
+        center = box.get_center() + DOWN * 0.02
+        x = center[0] + (index - (count - 1) / 2) * self._advance(self.font_size)
+        baseline = center[1] - self._template("0", self.font_size).height / 2
+        glyph = self._template(ch, self.font_size).copy()
+        glyph.move_to([x, 0, 0], coor_mask=np.array([1, 0, 0]))
+        glyph.shift(UP * (baseline - glyph.get_bottom()[1]))
+        return glyph
+
+    def _changed(self, value: str) -> list[int]:
+        if len(value) != len(self.value):
+            return list(range(max(len(value), len(self.value))))
+        return [i for i, (a, b) in enumerate(zip(self.value, value)) if a != b]
+
+    def set_value(self, value: str) -> None:
+        """Cambio inmediato: reemplaza solo los glifos que difieren."""
+        if value == self.value:
+            return
+        if len(value) != len(self.value):
+            self.digits.submobjects = [self._glyph_at(ch, i, len(value)) for i, ch in enumerate(value)]
         else:
-            if seg_idx == 0:
-                print(f"Sin filtro: {len(filtered)} tareas")
-
-        if seg_idx < len(segments) - 1:
-            tmp = Path("/tmp") / f"gantt_filter_{uuid.uuid4().hex}_{seg_idx}.tasks"
-            write_tasks_file(filtered, tmp)
-            temp_files.append(tmp)
-            filtered = load_tasks_from_file(tmp)
+            for i in self._changed(value):
+                self.digits.submobjects[i] = self._glyph_at(value[i], i, len(value))
+        self.value = value
+
+    def flip_to(self, value: str) -> list[Animation]:
+        """
+        Animaciones de flip hacia `value` (el glifo viejo cae y se apaga, el nuevo
+        baja desde arriba). Llamar a `settle()` después del play.
+        """
+        if value == self.value or len(value) != len(self.value):
+            self.set_value(value)
+            return []
+        anims: list[Animation] = []
+        for i in self._changed(value):
+            old = self.digits.submobjects[i]
+            new = self._glyph_at(value[i], i, len(value))
+            new.shift(UP * self.drop).set_opacity(0)
+            self.digits.submobjects[i] = new
+            self.add(old)
+            self._leaving.append(old)
+            anims.append(old.animate.shift(DOWN * self.drop).set_opacity(0))
+            anims.append(new.animate.shift(DOWN * self.drop).set_opacity(1))
+        self.value = value
+        return anims
+
+    def settle(self) -> None:
+        """Quita los glifos que salieron en el último flip."""
+        if self._leaving:
+            self.remove(*self._leaving)
+            self._leaving = []
+
+
+class FadedLine(Line):
+    """
+    Línea de un solo mobject con la opacidad del trazo variando a lo largo de
+    ella: un gradiente de trazo en la dirección de la línea con las paradas de
+    `opacities` repartidas parejo. Por defecto, opaca en los extremos y tenue
+    (`min_opacity`) al centro.
+    """
 
-    if args.debug:
-        levels = sorted({row[1] for row in filtered})
-        print(f"Niveles presentes: {levels}")
-        print("Tareas filtradas (id | nivel | título):")
-        for task_id, level, name, *_rest in filtered:
-            print(f"- {task_id} | {level} | {name}")
+    def __init__(
+        self,
+        start,
+        end,
+        color: ManimColor = GRAY_B,
+        stroke_width: float = 0.6,
+        min_opacity: float = 0.1,
+        opacities: tuple[float, ...] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(start, end, color=color, stroke_width=stroke_width, **kwargs)
+        self.set_fade(opacities or (1.0, min_opacity, 1.0))
+
+    def set_fade(self, opacities: tuple[float, ...]) -> FadedLine:
+        direction = self.get_end() - self.get_start()
+        length = np.linalg.norm(direction)
+        if length > 0:
+            self.set_sheen_direction(direction / length)
+        self.set_stroke(color=self.get_stroke_color(), opacity=list(opacities))
+        return self
+
+
+class StarBurst(VGroup):
+    """
+    Marca tipo destello: cuatro brazos de puntos que se achican y apagan hacia
+    afuera. Los puntos de un mismo paso (igual radio y opacidad) van como
+    subpaths de un solo VMobject, así que son ~STEPS mobjects en vez de
+    4 * STEPS Dot. Si los puntos de un paso se superponen, se reparten en
+    VMobjects distintos: dentro de un path el cruce se pinta una sola vez, y
+    con Dot separados la opacidad se acumulaba. La geometría se arma una vez
+    por (color, semilla, tamaño) y luego solo se copia y se desplaza.
+    """
 
-    write_tasks_file(filtered, args.output)
-    print(f"Escrito: {args.output}")
+    STEPS = 5
+    ARMS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    _cache: dict[tuple[str, object, float, int], StarBurst] = {}
+
+    def __init__(self, color: ManimColor, base_radius: float, **kwargs) -> None:
+        super().__init__(**kwargs)
+        for i in range(1, self.STEPS + 1):
+            t = i / self.STEPS
+            radius = max(0.006, base_radius * (0.55 - 0.35 * t))
+            offset = base_radius * 2.4 * t
+            # Brazos vecinos a offset * sqrt(2), opuestos a 2 * offset (tangentes no cuentan).
+            if offset * 2**0.5 >= 2 * radius - 1e-9:
+                groups = [self.ARMS]
+            elif offset >= radius - 1e-9:
+                groups = [self.ARMS[:2], self.ARMS[2:]]
+            else:
+                groups = [(arm,) for arm in self.ARMS]
+            for arms in groups:
+                ring = VMobject(fill_color=color, fill_opacity=0.75 - 0.6 * t, stroke_width=0)
+                for dx, dy in arms:
+                    ring.append_points(Circle(radius=radius).shift([dx * offset, dy * offset, 0]).points)
+                self.add(ring)
+
+    @classmethod
+    def at(cls, cx: float, cy: float, color: ManimColor, seed, size: float, draw: int = 0) -> StarBurst:
+        """
+        Destello centrado en (cx, cy). El radio base es `size` con un leve jitter
+        tomado de random.Random(seed) (el `draw`-ésimo valor, para varias marcas
+        con la misma semilla).
+        """
+        key = (str(color), seed, size, draw)
+        template = cls._cache.get(key)
+        if template is None:
+            rng = random.Random(seed)
+            for _ in range(draw):
+                rng.uniform(-0.004, 0.004)
+            template = cls(color, size + rng.uniform(-0.004, 0.004))
+            cls._cache[key] = template
+        return template.copy().shift([cx, cy, 0])
+
+
+class SegmentedBar(VGroup):
+    """
+    Barra de segmentos rectangulares. Borde izquierdo, ancho, color y clave de
+    cada segmento viven en arreglos; los segmentos de un mismo color van como
+    subpaths de un solo VMobject con relleno sólido (un hijo por color), así
+    cada segmento conserva su color exacto sin mezclarse con los vecinos.
+    `set_lit(n)` deja visibles solo los segmentos con clave <= n y rearma solo
+    los colores que cambian (no anima mobjects por segmento).
+    """
 
-    for tmp in temp_files:
-        try:
-            os.remove(tmp)
-        except OSError:
-            pass
-    return 0
+    def __init__(
+        self,
+        lefts,
+        widths,
+        y: float,
+        bar_height: float,
+        colors: list[ManimColor],
+        opacity: float = 1.0,
+        keys=None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.lefts = np.asarray(lefts, dtype=np.float64)
+        self.rights = self.lefts + np.asarray(widths, dtype=np.float64)
+        self.bar_y = y
+        self.bar_height = bar_height
+        self.keys = np.zeros(len(self.lefts), dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        rgbs = np.array([ManimColor(c).to_rgb() for c in colors], dtype=np.float64).reshape(-1, 3)
+        # color_of[i]: hijo (color) del segmento i
+        unique, self.color_of = np.unique(rgbs, axis=0, return_inverse=True)
+        self.color_of = self.color_of.reshape(-1)
+        for rgb in unique:
+            self.add(VMobject(fill_color=ManimColor(rgb), fill_opacity=opacity, stroke_width=0))
+        self._shown = np.ones(len(self.lefts), dtype=bool)
+        self._lit: int | None = None
+        for child in range(len(unique)):
+            self._refresh(child)
+
+    @property
+    def size(self) -> int:
+        return len(self.lefts)
+
+    def set_lit(self, n: int | None) -> SegmentedBar:
+        """Muestra los segmentos con clave <= n (None: todos)."""
+        if n == self._lit:
+            return self
+        self._lit = n
+        shown = np.ones(self.size, dtype=bool) if n is None else self.keys <= n
+        changed = np.unique(self.color_of[shown != self._shown])
+        self._shown = shown
+        for child in changed:
+            self._refresh(int(child))
+        return self
+
+    def _refresh(self, child: int) -> None:
+        idx = np.flatnonzero(self._shown & (self.color_of == child))
+        if not len(idx):
+            self.submobjects[child].set_points(np.zeros((0, 3)))
+            return
+        x0 = self.lefts[idx]
+        x1 = self.rights[idx]
+        y0 = self.bar_y - self.bar_height / 2
+        y1 = self.bar_y + self.bar_height / 2
+        # Rectángulos como 4 cúbicas rectas cada uno (UR, UL, DL, DR, UR)
+        corners = np.zeros((len(idx), 5, 3))
+        corners[:, :, 0] = np.stack([x1, x0, x0, x1, x1], axis=1)
+        corners[:, :, 1] = [y1, y1, y0, y0, y1]
+        a, b = corners[:, :-1], corners[:, 1:]
+        self.submobjects[child].set_points(
+            np.stack([a, a + (b - a) / 3, a + 2 * (b - a) / 3, b], axis=2).reshape(-1, 3)
+        )
 
 
 # =============================================================================
@@ -421,40 +326,38 @@ def run_filter_cli() -> int:
 
 
 class GanttTimelineLevel2(Scene):
+    # Avance día a día: "pasos" (un play por día, con flips) o "tracker" (un solo
+    # play; un ValueTracker de fecha mueve contadores, dial y barra por updaters).
+    # Se pueden cambiar con GANTT_DAY_ENGINE y GANTT_DAYS_PER_SECOND.
+    DAY_ENGINES = ("pasos", "tracker")
+    DAY_ENGINE = "pasos"
+    DAYS_PER_SECOND = 5.0
+
     def construct(self):
+        # Se valida antes de cargar nada: un motor mal escrito no debe caer en silencio en otro.
+        engine = os.environ.get("GANTT_DAY_ENGINE", self.DAY_ENGINE)
+        if engine not in self.DAY_ENGINES:
+            raise ValueError(
+                f"GANTT_DAY_ENGINE={engine!r} no es válido; usa {' o '.join(self.DAY_ENGINES)}."
+            )
+        days_per_second = float(os.environ.get("GANTT_DAYS_PER_SECOND", self.DAYS_PER_SECOND))
         tasks = get_tasks_for_render()
 
         title_text = "Hablitación Plataforma Calypso Banco BCI"
         subtitle_text = "Ambiente Pre Productivo"
-        level0 = next((row for row in tasks if row[1] == 0), None)
-        level1 = next((row for row in tasks if row[1] == 1), None)
+        level0 = next((task for task in tasks if task.level == 0), None)
+        level1 = next((task for task in tasks if task.level == 1), None)
         if level0:
-            title_text = level0[2]
+            title_text = level0.name
         if level1:
-            subtitle_text = level1[2]
-
-        tasks = [row for row in tasks if row[1] >= 2]
-
-        dated = []
-        undated = []
-        for row in tasks:
-            task_id, _, name, *_rest, start, end, pct, _dur, _pred = row
-            if start and end:
-                dated.append(
-                    {
-                        "id": task_id,
-                        "name": name,
-                        "start": datetime.strptime(start, "%d/%m/%y"),
-                        "end": datetime.strptime(end, "%d/%m/%y"),
-                        "start_str": start,
-                        "end_str": end,
-                        "pct": pct,
-                    }
-                )
-            else:
-                undated.append({"id": task_id, "name": name})
+            subtitle_text = level1.name
+
+        tasks = [task for task in tasks if task.level >= 2]
 
-        dated.sort(key=lambda t: t["start"])
+        dated = [task for task in tasks if task.start and task.end]
+        undated = [task for task in tasks if not (task.start and task.end)]
+
+        dated.sort(key=lambda t: t.start)
 
         title = Text(title_text, font_size=28, weight=BOLD)
         subtitle = Text(subtitle_text, font_size=16, color=GRAY_B)
@@ -463,14 +366,15 @@ class GanttTimelineLevel2(Scene):
 
         # Contador estilo "flip" con fecha (animable)
         today_dt = datetime.now()
-        start_date = date(today_dt.year, 1, 6)
+        start_date, _ = tld_window(today_dt.date())
         current_date = start_date
-        target_pct = 19.0
-        days_total = business_days_count(start_date, today_dt.date(), HOLIDAYS_2026)
+        target_pct = TLD_DAYS_TARGET_PCT
+        # Calendario hábil precalculado: todos los conteos de la escena salen de aquí.
+        calendar = project_calendar()
+        days_total = calendar.count(start_date, today_dt.date())
         if days_total <= 0:
             days_total = 1
-        start_day_date = _as_date(start_date)
-        start_is_business = start_day_date.weekday() < 5 and start_day_date not in HOLIDAYS_2026
+        start_is_business = calendar.is_business_day(start_date)
         start_day_count = 1 if start_is_business else 0
         start_pct = (target_pct / days_total) * start_day_count
 
@@ -493,7 +397,7 @@ class GanttTimelineLevel2(Scene):
             f"{current_date.year:04d}",
         ]
         counter_boxes = VGroup()
-        counter_blocks: list[dict[str, object]] = []
+        counter_blocks: list[FlipCounter] = []
         for label, value in zip(counter_labels, counter_values):
             if label == "Año":
                 box_width = 0.72 * counter_scale
@@ -501,58 +405,17 @@ class GanttTimelineLevel2(Scene):
                 box_width = 0.62 * counter_scale
             else:
                 box_width = 0.57 * counter_scale
-            box = RoundedRectangle(
+            dot_color = {"Real %": GREEN_E, "Plan %": GREEN_A}.get(label)
+            counter = FlipCounter(
+                label,
+                value,
                 width=box_width,
                 height=0.36 * counter_scale,
-                corner_radius=0.05 * counter_scale,
-                stroke_width=1,
-                stroke_color=GRAY_D,
-                fill_color=BLACK,
-                fill_opacity=0.35,
-            )
-            # División central tipo reloj de aeropuerto (prepara animación de "flip")
-            mid_y = box.get_center()[1]
-            split_line = Line(
-                [box.get_left()[0], mid_y, 0],
-                [box.get_right()[0], mid_y, 0],
-                color=GRAY_C,
-                stroke_width=1,
-                stroke_opacity=0.6,
+                scale=counter_scale,
+                dot_color=dot_color,
             )
-            # Mitad superior/inferior con leve contraste
-            top_mask = Rectangle(
-                width=box.width,
-                height=box.height / 2,
-                stroke_width=0,
-                fill_color=BLACK,
-                fill_opacity=0.22,
-            ).move_to([box.get_center()[0], mid_y + box.height / 4, 0])
-            bottom_mask = Rectangle(
-                width=box.width,
-                height=box.height / 2,
-                stroke_width=0,
-                fill_color=BLACK,
-                fill_opacity=0.38,
-            ).move_to([box.get_center()[0], mid_y - box.height / 4, 0])
-
-            value_text = Text(
-                value, font_size=16 * counter_scale, weight=BOLD, color=WHITE, font="DejaVu Sans Mono"
-            )
-            value_text.move_to(box.get_center() + DOWN * 0.02)
-            label_text = Text(label, font_size=6 * counter_scale, color=GRAY_B)
-            label_text.next_to(box, UP, buff=0.05 * counter_scale)
-            if label in ("Real %", "Plan %"):
-                dot_color = GREEN_E if label == "Real %" else GREEN_A
-                dot = Dot(
-                    label_text.get_left() + LEFT * 0.06 * counter_scale,
-                    radius=0.04 * counter_scale,
-                    color=dot_color,
-                )
-                label_text = VGroup(dot, label_text)
-            card = VGroup(box, top_mask, bottom_mask, split_line, value_text)
-            group = VGroup(label_text, card)
-            counter_boxes.add(group)
-            counter_blocks.append({"group": group, "card": card})
+            counter_boxes.add(counter)
+            counter_blocks.append(counter)
         counter_boxes.arrange(RIGHT, buff=0.14 * counter_scale, aligned_edge=DOWN)
         counter_boxes.to_edge(UP, buff=0.5)
         counter_boxes.set_x(0)
@@ -562,14 +425,14 @@ class GanttTimelineLevel2(Scene):
         timeline_right = RIGHT * 5.5 + DOWN * 0.2
         timeline = Line(timeline_left, timeline_right, color=GRAY_B, stroke_width=4)
 
+        table = TaskTable(dated)
         if dated:
-            start_min = min(t["start"] for t in dated)
-            end_max = max(t["end"] for t in dated)
+            start_min, end_max = table.span()
         else:
-            start_min = datetime.now()
-            end_max = datetime.now()
+            start_min = date.today()
+            end_max = date.today()
 
-        def date_to_x(value: datetime) -> float:
+        def date_to_x(value: date) -> float:
             total = (end_max - start_min).days or 1
             offset = (value - start_min).days
             ratio = offset / total
@@ -582,74 +445,39 @@ class GanttTimelineLevel2(Scene):
         tmd_label.next_to([timeline_left[0], scale_y, 0], LEFT, buff=0.4)
 
         # Línea roja central (TLD) con difuminado vertical
-        def _red_glow_at(x_pos: float) -> VGroup:
-            glow = VGroup()
+        def _red_glow_at(x_pos: float) -> FadedLine:
             glow_height = 1.2
-            glow_segs = 12
-            min_opacity = 0.05
-            for s in range(glow_segs):
-                t0 = s / glow_segs
-                t1 = (s + 1) / glow_segs
-                y0 = scale_y - glow_height / 2 + glow_height * t0
-                y1 = scale_y - glow_height / 2 + glow_height * t1
-                t_mid = (t0 + t1) / 2
-                opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-                seg = Line(
-                    [x_pos, y0, 0],
-                    [x_pos, y1, 0],
-                    color=RED_E,
-                    stroke_width=1.6,
-                    stroke_opacity=opacity,
-                )
-                glow.add(seg)
-            return glow
+            return FadedLine(
+                [x_pos, scale_y - glow_height / 2, 0],
+                [x_pos, scale_y + glow_height / 2, 0],
+                color=RED_E,
+                stroke_width=1.6,
+                min_opacity=0.05,
+            )
 
         # Fecha de hoy (ajuste de año solo si cae dentro del rango del Gantt)
-        today = datetime.now()
-        if today.year != start_min.year:
-            try:
-                candidate = today.replace(year=start_min.year)
-            except ValueError:
-                candidate = today.replace(year=start_min.year, day=28)
-            if start_min <= candidate <= end_max:
-                today = candidate
+        today = adjusted_today(start_min, end_max)
 
         # Promedio global de avance real y planificado para marcador de "hoy"
-        pct_all = []
-        for t in dated:
-            if t.get("pct"):
-                try:
-                    pct_all.append(float(str(t["pct"]).replace("%", "").strip()))
-                except ValueError:
-                    pass
-        avg_all = round(sum(pct_all) / len(pct_all)) if pct_all else None
-        planned_all = []
-        for t in dated:
-            start_d = t["start"]
-            end_d = t["end"]
-            total_days = max(1, (end_d - start_d).days)
-            if today <= start_d:
-                planned = 0.0
-            elif today >= end_d:
-                planned = 100.0
-            else:
-                elapsed = (today - start_d).days
-                planned = (elapsed / total_days) * 100.0
-            planned_all.append(planned)
-        avg_planned = round(sum(planned_all) / len(planned_all)) if planned_all else None
+        # (el índice de tramos se arma una vez: lo consultan el plan y la serie diaria)
+        spans = table.span_index()
+        avg_all, avg_planned = progress_targets(table, today, spans)
         real_pct_val = int(round(avg_all)) if avg_all is not None else 0
         planned_pct_val = int(round(avg_planned)) if avg_planned is not None else 0
+        # Serie día a día precalculada: el bucle de la animación solo la lee.
+        series = daily_series(
+            calendar, start_date, today_dt.date(), real_pct_val, planned_pct_val, target_pct, spans
+        )
 
         # Línea de "hoy" interpolada entre puntos vecinos para respetar separaciones reales
-        date_keys = [t["start"].date() for t in dated]
+        date_keys = [t.start for t in dated]
         if date_keys:
-            today_date = today.date()
-            prev_d = max((d for d in date_keys if d <= today_date), default=date_keys[0])
-            next_d = min((d for d in date_keys if d >= today_date), default=date_keys[-1])
-            x_prev = date_to_x(datetime.combine(prev_d, datetime.min.time()))
-            x_next = date_to_x(datetime.combine(next_d, datetime.min.time()))
+            prev_d = max((d for d in date_keys if d <= today), default=date_keys[0])
+            next_d = min((d for d in date_keys if d >= today), default=date_keys[-1])
+            x_prev = date_to_x(prev_d)
+            x_next = date_to_x(next_d)
             span = (next_d - prev_d).days or 1
-            ratio_local = (today_date - prev_d).days / span
+            ratio_local = (today - prev_d).days / span
             x_today = x_prev + (x_next - x_prev) * ratio_local
         else:
             x_today = date_to_x(today)
@@ -726,12 +554,12 @@ class GanttTimelineLevel2(Scene):
             today_pct = Text(" | ".join(pct_parts), font_size=8, color=GREEN_E)
         else:
             today_pct = None
-        total_days = business_days_count(start_min, end_max, HOLIDAYS_2026)
-        calendar_days = (end_max.date() - start_min.date()).days + 1
-        holidays_span = holidays_in_span(start_min, end_max, HOLIDAYS_2026)
-        holidays_count = len(holidays_span)
-        elapsed_end = min(today.date(), end_max.date())
-        elapsed_days = business_days_count(start_min, elapsed_end, HOLIDAYS_2026)
+        warn_missing_years(calendar, min(start_min, start_date), max(end_max, today), f"{resolve_calendar_spec()} ")
+        total_days = calendar.count(start_min, end_max)
+        calendar_days = (end_max - start_min).days + 1
+        holidays_count = calendar.holidays_count(start_min, end_max)
+        elapsed_end = min(today, end_max)
+        elapsed_days = calendar.count(start_min, elapsed_end)
         elapsed_pct = int(round((elapsed_days / total_days) * 100)) if total_days else 0
         today_days = Text(f"HAB {total_days}d", font_size=8, color=GREEN_E)
         today_elapsed = Text(f"TRANS {elapsed_days}d", font_size=8, color=GREEN_E)
@@ -742,21 +570,12 @@ class GanttTimelineLevel2(Scene):
         info_items.extend([today_days, today_elapsed, today_elapsed_pct])
         today_info = VGroup(*info_items).arrange(DOWN, buff=0.04, aligned_edge=LEFT)
         today_info.move_to([timeline_left[0] - 1.0, dial_center_y + 0.12, 0])
-        today_info_line = VGroup()
         line_y = dial_center_y + 0.12
         line_left = x_today - 0.12
         line_right = today_info.get_right()[0]
-        line_segs = 10
-        min_opacity = 0.1
-        for s in range(line_segs):
-            t0 = s / line_segs
-            t1 = (s + 1) / line_segs
-            x0 = line_left + (line_right - line_left) * t0
-            x1 = line_left + (line_right - line_left) * t1
-            t_mid = (t0 + t1) / 2
-            opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-            seg = Line([x0, line_y, 0], [x1, line_y, 0], color=GREEN_E, stroke_width=1, stroke_opacity=opacity)
-            today_info_line.add(seg)
+        today_info_line = VGroup(
+            FadedLine([line_left, line_y, 0], [line_right, line_y, 0], color=GREEN_E, stroke_width=1)
+        )
         # punta simple: tres puntos decrecientes hacia la barra (lado de x_today)
         tip_radii = [0.04, 0.028, 0.018]
         tip_offsets = [-0.16, -0.07, 0.0]
@@ -765,39 +584,7 @@ class GanttTimelineLevel2(Scene):
             today_info_line.add(tip)
 
         if "DEBUG_TODAY" in os.environ:
-            print(f"[DEBUG_TODAY] start_min={start_min.date()} end_max={end_max.date()} today={today.date()}")
-
-        def star_burst_tlu(cx, cy, color, jitter):
-            star = VGroup()
-            base_r = 0.05 + jitter.uniform(-0.004, 0.004)
-            steps = 5
-            for direction in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                dx, dy = direction
-                for i in range(1, steps + 1):
-                    t = i / steps
-                    radius = base_r * (0.55 - 0.35 * t)
-                    opacity = 0.75 - 0.6 * t
-                    offset = base_r * 2.4 * t
-                    x = cx + dx * offset
-                    y = cy + dy * offset
-                    star.add(Dot([x, y, 0], radius=max(0.006, radius), color=color).set_opacity(opacity))
-            return star
-
-        def star_burst_end_points(cx, cy, color, jitter):
-            star = VGroup()
-            base_r = 0.034 + jitter.uniform(-0.004, 0.004)
-            steps = 5
-            for direction in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                dx, dy = direction
-                for i in range(1, steps + 1):
-                    t = i / steps
-                    radius = base_r * (0.55 - 0.35 * t)
-                    opacity = 0.75 - 0.6 * t
-                    offset = base_r * 2.4 * t
-                    x = cx + dx * offset
-                    y = cy + dy * offset
-                    star.add(Dot([x, y, 0], radius=max(0.006, radius), color=color).set_opacity(opacity))
-            return star
+            print(f"[DEBUG_TODAY] start_min={start_min} end_max={end_max} today={today}")
 
         points = VGroup()
         end_points = VGroup()
@@ -813,17 +600,19 @@ class GanttTimelineLevel2(Scene):
         full_test_segments = VGroup()
         pct_by_date: dict = {}
 
-        grouped = OrderedDict()
-        for task in dated:
-            key = task["start"].date()
-            grouped.setdefault(key, []).append(task)
-
-        end_grouped = OrderedDict()
-        for task in dated:
-            if task["end"].date() == task["start"].date():
-                continue
-            end_key = task["end"].date()
-            end_grouped.setdefault(end_key, []).append(task)
+        # Layout vectorizado: grupos por fecha de inicio, x de cada grupo/tarea y % por grupo
+        x_left, x_right = timeline_left[0], timeline_right[0]
+        group_keys, group_offsets, group_counts = table.start_groups()
+        group_x = TaskTable.positions(group_keys, start_min, end_max, x_left, x_right)
+        group_pct = table.group_mean_pct(group_offsets)
+        grouped = OrderedDict(
+            (key, dated[off:off + cnt])
+            for key, off, cnt in zip(group_keys.tolist(), group_offsets.tolist(), group_counts.tolist())
+        )
+        task_x_start = TaskTable.positions(table.start, start_min, end_max, x_left, x_right)
+        task_x_end = TaskTable.positions(table.end, start_min, end_max, x_left, x_right)
+        end_keys = np.unique(table.end[table.end != table.start])
+        end_x = TaskTable.positions(end_keys, start_min, end_max, x_left, x_right)
 
         above_idx = 0
         below_idx = 0
@@ -831,11 +620,10 @@ class GanttTimelineLevel2(Scene):
 
         date_keys = list(grouped.keys())
         for idx, (key, tasks_for_date) in enumerate(grouped.items()):
-            x = date_to_x(tasks_for_date[0]["start"])
+            x = float(group_x[idx])
             y = timeline_left[1]
 
-            rng = random.Random(tasks_for_date[0]["id"])
-            point = star_burst_tlu(x, y, RED_E, rng)
+            point = StarBurst.at(x, y, RED_E, tasks_for_date[0].id, 0.05)
 
             above = idx % 2 == 0
             if above:
@@ -845,7 +633,7 @@ class GanttTimelineLevel2(Scene):
                 stem_len = [1.0, 1.5, 2.0][below_idx % 3] * spacing_scale
                 below_idx += 1
 
-            date_text = tasks_for_date[0]["start"].strftime("%d/%m")
+            date_text = tasks_for_date[0].start.strftime("%d/%m")
             date_label = Text(date_text, font_size=10, color=RED_E)
             date_label.next_to(point, DOWN if above else UP, buff=0.1)
 
@@ -859,11 +647,11 @@ class GanttTimelineLevel2(Scene):
                 offset = offsets[t_idx] if t_idx < len(offsets) else offsets[-1]
                 target_y = y + (offset if above else -offset)
 
-                id_line = f"ID {task['id']}"
-                if task.get("pct"):
-                    id_line = f"{id_line}  {task['pct']}"
+                id_line = f"ID {task.id}"
+                if task.pct is not None:
+                    id_line = f"{id_line}  {task.pct_str}"
                 title_text = Text(id_line, font_size=12, weight=BOLD)
-                end_text = Text(f"Fin: {task['end_str']}", font_size=9, color=GRAY_C)
+                end_text = Text(f"Fin: {task.end_str}", font_size=9, color=GRAY_C)
                 text_block = VGroup(title_text, end_text).arrange(DOWN, buff=0.06, aligned_edge=LEFT)
 
                 text_block.move_to([x, target_y, 0])
@@ -906,23 +694,13 @@ class GanttTimelineLevel2(Scene):
             dates.add(date_label)
             stems_bg.add(scale_marks)
 
-            pcts = []
-            for t in tasks_for_date:
-                if t.get("pct"):
-                    try:
-                        pcts.append(float(str(t["pct"]).replace("%", "").strip()))
-                    except ValueError:
-                        pass
-            if pcts:
-                pct_by_date[key] = round(sum(pcts) / len(pcts))
+            if not np.isnan(group_pct[idx]):
+                pct_by_date[key] = round(float(group_pct[idx]))
 
         # Marcar fechas de fin en la escala inferior (solo punto + fecha)
-        end_keys_sorted = sorted(end_grouped.keys())
-        for idx, end_key in enumerate(end_keys_sorted):
-            x_end = date_to_x(datetime.combine(end_key, datetime.min.time()))
+        for idx, (end_key, x_end) in enumerate(zip(end_keys.tolist(), end_x.tolist())):
             y = scale_y
-            rng = random.Random(end_key.toordinal())
-            end_point = star_burst_end_points(x_end, y, BLUE_D, rng)
+            end_point = StarBurst.at(x_end, y, BLUE_D, end_key.toordinal(), 0.034)
             end_label = Text(end_key.strftime("%d/%m"), font_size=8, color=BLUE_D)
             if idx % 2 == 0:
                 end_label.next_to(end_point, DOWN, buff=0.08)
@@ -933,24 +711,30 @@ class GanttTimelineLevel2(Scene):
 
         # Escala inferior estilo "mapa": barra segmentada con dias por tramo
         bar_height = 0.15
-        bar_bg = VGroup()
-        bar_lit = VGroup()
-        bar_full = VGroup()
-        day_segments_map: dict[int, list[Mobject]] = {}
+        # Segmentos en arreglos (borde izquierdo, ancho, color, día hábil); se
+        # arman como SegmentedBar al cerrar el recorrido.
+        bg_lefts: list[float] = []
+        bg_widths: list[float] = []
+        full_colors: list[ManimColor] = []
+        lit_lefts: list[float] = []
+        lit_widths: list[float] = []
+        lit_colors: list[ManimColor] = []
+        lit_keys: list[int] = []
         business_day_index = 0
         date_guides = VGroup()
         holiday_marks = VGroup()
-        scale_keys = sorted(set(date_keys + [t["end"].date() for t in dated]))
+        scale_keys = sorted(set(date_keys + [t.end for t in dated]))
+        span_weekdays, span_holidays = calendar.spans(scale_keys)
         for i in range(1, len(scale_keys)):
             d0 = scale_keys[i - 1]
             d1 = scale_keys[i]
-            business_days = business_days_in_span(d0, d1)
+            business_days = span_weekdays[i - 1]
             biz_count = len(business_days)
-            holiday_days = holidays_in_span(d0, d1, HOLIDAYS_2026)
+            holiday_days = span_holidays[i - 1]
             holiday_set = set(holiday_days)
             holiday_count = len(holiday_days)
-            x0 = date_to_x(datetime.combine(d0, datetime.min.time()))
-            x1 = date_to_x(datetime.combine(d1, datetime.min.time()))
+            x0 = date_to_x(d0)
+            x1 = date_to_x(d1)
             mid_x = (x0 + x1) / 2
 
             seg_width = max(0.01, x1 - x0)
@@ -966,25 +750,9 @@ class GanttTimelineLevel2(Scene):
                 t_prog = 0.0
                 # Fondo apagado
                 for dx in dual_offsets:
-                    bg_seg = Rectangle(
-                        width=dual_w,
-                        height=bar_height,
-                        stroke_width=0,
-                        fill_color=GRAY_C,
-                        fill_opacity=0.32,
-                    )
-                    bg_seg.move_to([x0 + 0.5 * unit_w + dx, scale_y, 0])
-                    bar_bg.add(bg_seg)
-
-                    full_seg = Rectangle(
-                        width=dual_w,
-                        height=bar_height,
-                        stroke_width=0,
-                        fill_color=interpolate_color(RED_E, GREEN_B, t_prog * 2),
-                        fill_opacity=1,
-                    )
-                    full_seg.move_to([x0 + 0.5 * unit_w + dx, scale_y, 0])
-                    bar_full.add(full_seg)
+                    bg_lefts.append(x0 + 0.5 * unit_w + dx - dual_w / 2)
+                    bg_widths.append(dual_w)
+                    full_colors.append(interpolate_color(RED_E, GREEN_B, t_prog * 2))
             else:
                 for idx_day, day in enumerate(business_days):
                     seg_x = x0 + (idx_day + 0.5) * unit_w
@@ -1000,56 +768,23 @@ class GanttTimelineLevel2(Scene):
                     business_day_index += 1
 
                     t_prog = idx_day / max(1, biz_count - 1)
-                    # Fondo apagado
-                    for dx in dual_offsets:
-                        bg_seg = Rectangle(
-                            width=dual_w,
-                            height=bar_height,
-                            stroke_width=0,
-                            fill_color=GRAY_C,
-                            fill_opacity=0.32,
-                        )
-                        bg_seg.move_to([seg_x + dx, scale_y, 0])
-                        bar_bg.add(bg_seg)
-
-                    # Full test (100%)
+                    # Full test (100%): gradiente rojo -> verde -> azul a lo largo del tramo
                     if t_prog <= 0.5:
                         full_color = interpolate_color(RED_E, GREEN_B, t_prog * 2)
                     else:
                         full_color = interpolate_color(GREEN_B, BLUE_E, (t_prog - 0.5) * 2)
+                    # Encendido real: hasta el % del tramo, con el mismo color del full test
+                    lit = pct_norm > 0 and t_prog <= pct_norm
                     for dx in dual_offsets:
-                        full_seg = Rectangle(
-                            width=dual_w,
-                            height=bar_height,
-                            stroke_width=0,
-                            fill_color=full_color,
-                            fill_opacity=1,
-                        )
-                        full_seg.move_to([seg_x + dx, scale_y, 0])
-                        bar_full.add(full_seg)
-
-                    if pct_norm > 0 and t_prog <= pct_norm:
-                        if t_prog <= 0.5:
-                            color = interpolate_color(RED_E, GREEN_B, t_prog * 2)
-                        else:
-                            color = interpolate_color(GREEN_B, BLUE_E, (t_prog - 0.5) * 2)
-                        opacity = 1
-                    else:
-                        color = None
-                        opacity = 0
-                    for dx in dual_offsets:
-                        seg = Rectangle(
-                            width=dual_w,
-                            height=bar_height,
-                            stroke_width=0,
-                            fill_color=color if color else GRAY_C,
-                            fill_opacity=opacity,
-                        )
-                        seg.move_to([seg_x + dx, scale_y, 0])
-                        if opacity > 0:
-                            seg.set_opacity(0)
-                            bar_lit.add(seg)
-                            day_segments_map.setdefault(business_day_index, []).append(seg)
+                        left = seg_x + dx - dual_w / 2
+                        bg_lefts.append(left)
+                        bg_widths.append(dual_w)
+                        full_colors.append(full_color)
+                        if lit:
+                            lit_lefts.append(left)
+                            lit_widths.append(dual_w)
+                            lit_colors.append(full_color)
+                            lit_keys.append(business_day_index)
 
             tick = Line([x0, scale_y + 0.08, 0], [x0, scale_y - 0.08, 0], color=GRAY_B, stroke_width=1)
             if holiday_count > 0:
@@ -1063,28 +798,22 @@ class GanttTimelineLevel2(Scene):
                 txt.move_to([mid_x, scale_y - 0.28, 0])
                 deltas.add(VGroup(tick, txt))
 
+        bar_bg = SegmentedBar(bg_lefts, bg_widths, scale_y, bar_height, [GRAY_C] * len(bg_lefts), opacity=0.32)
+        bar_full = SegmentedBar(bg_lefts, bg_widths, scale_y, bar_height, full_colors)
+        # Se enciende por día hábil durante el avance (set_lit), parte apagada.
+        bar_lit = SegmentedBar(lit_lefts, lit_widths, scale_y, bar_height, lit_colors, keys=lit_keys).set_lit(0)
 
         if scale_keys:
-            x_start = date_to_x(datetime.combine(scale_keys[0], datetime.min.time()))
-            x_end = date_to_x(datetime.combine(scale_keys[-1], datetime.min.time()))
+            x_start = date_to_x(scale_keys[0])
+            x_end = date_to_x(scale_keys[-1])
             deltas.add(Line([x_end, scale_y + 0.08, 0], [x_end, scale_y - 0.08, 0], color=GRAY_B, stroke_width=1))
             # Guías finas desde la fecha superior hacia la escala inferior
             for idx, d in enumerate(date_keys):
-                x = date_to_x(datetime.combine(d, datetime.min.time()))
+                x = date_to_x(d)
                 # Guía con desvanecido en el centro
                 y_top = timeline_left[1]
                 y_bottom = scale_y - 0.28
-                segs = 7
-                min_opacity = 0.1
-                for s in range(segs):
-                    t0 = s / segs
-                    t1 = (s + 1) / segs
-                    y0 = y_top + (y_bottom - y_top) * t0
-                    y1 = y_top + (y_bottom - y_top) * t1
-                    t_mid = (t0 + t1) / 2
-                    opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-                    seg = Line([x, y0, 0], [x, y1, 0], color=GRAY_B, stroke_width=0.5, stroke_opacity=opacity)
-                    date_guides.add(seg)
+                date_guides.add(FadedLine([x, y_top, 0], [x, y_bottom, 0], color=GRAY_B, stroke_width=0.5))
 
         # Conectores inicio-fin en TMD (lineas horizontales con desvanecido)
         def _top_or_scale(group):
@@ -1100,74 +829,27 @@ class GanttTimelineLevel2(Scene):
         connector_levels = [base_y + i * level_step for i in range(levels_count)]
 
         for idx, task in enumerate(dated):
-            if task["end"].date() == task["start"].date():
+            if task.end == task.start:
                 continue
-            rng = random.Random(task["id"])
-            x_start = date_to_x(task["start"])
-            x_end = date_to_x(task["end"])
+            x_start = float(task_x_start[idx])
+            x_end = float(task_x_end[idx])
             if x_end < x_start:
                 x_start, x_end = x_end, x_start
             y = connector_levels[idx % len(connector_levels)]
-            segs = 10
-            min_opacity = 0.1
-            for s in range(segs):
-                t0 = s / segs
-                t1 = (s + 1) / segs
-                x0 = x_start + (x_end - x_start) * t0
-                x1 = x_start + (x_end - x_start) * t1
-                t_mid = (t0 + t1) / 2
-                opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-                seg = Line([x0, y, 0], [x1, y, 0], color=GRAY_B, stroke_width=0.6, stroke_opacity=opacity)
-                connectors.add(seg)
+            connectors.add(FadedLine([x_start, y, 0], [x_end, y, 0], color=GRAY_B, stroke_width=0.6))
             # Marca de inicio: punto en el extremo y bajada suave hasta TMD
-            def star_burst(cx, cy, color, jitter):
-                star = VGroup()
-                base_r = 0.034 + jitter.uniform(-0.004, 0.004)
-                steps = 5
-                for direction in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                    dx, dy = direction
-                    for i in range(1, steps + 1):
-                        t = i / steps
-                        radius = base_r * (0.55 - 0.35 * t)
-                        opacity = 0.75 - 0.6 * t
-                        offset = base_r * 2.4 * t
-                        x = cx + dx * offset
-                        y = cy + dy * offset
-                        star.add(
-                            Dot([x, y, 0], radius=max(0.006, radius), color=color).set_opacity(opacity)
-                        )
-                return star
-
-            start_blob = star_burst(x_start, y, RED_E, rng)
-            drop_segs = 10
-            for s in range(drop_segs):
-                t0 = s / drop_segs
-                t1 = (s + 1) / drop_segs
-                y0 = y + (scale_y - y) * t0
-                y1 = y + (scale_y - y) * t1
-                t_mid = (t0 + t1) / 2
-                opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-                vseg = Line([x_start, y0, 0], [x_start, y1, 0], color=RED_E, stroke_width=0.6, stroke_opacity=opacity)
-                connector_ends.add(vseg)
+            start_blob = StarBurst.at(x_start, y, RED_E, task.id, 0.034)
+            connector_ends.add(FadedLine([x_start, y, 0], [x_start, scale_y, 0], color=RED_E, stroke_width=0.6))
             connector_ends.add(start_blob)
             # Marca de fin: punto en el extremo y bajada suave hasta TMD
-            end_blob = star_burst(x_end, y, BLUE_D, rng)
-            drop_segs = 10
-            for s in range(drop_segs):
-                t0 = s / drop_segs
-                t1 = (s + 1) / drop_segs
-                y0 = y + (scale_y - y) * t0
-                y1 = y + (scale_y - y) * t1
-                t_mid = (t0 + t1) / 2
-                opacity = min_opacity + (1 - min_opacity) * abs(2 * t_mid - 1)
-                vseg = Line([x_end, y0, 0], [x_end, y1, 0], color=BLUE_D, stroke_width=0.6, stroke_opacity=opacity)
-                connector_ends.add(vseg)
+            end_blob = StarBurst.at(x_end, y, BLUE_D, task.id, 0.034, draw=1)
+            connector_ends.add(FadedLine([x_end, y, 0], [x_end, scale_y, 0], color=BLUE_D, stroke_width=0.6))
             connector_ends.add(end_blob)
 
         if undated:
             undated_title = Text("Sin fechas", font_size=16, color=GRAY_B)
             undated_lines = VGroup(
-                *[Text(f"{t['id']} - {t['name']}", font_size=14) for t in undated]
+                *[Text(f"{t.id} - {t.name}", font_size=14) for t in undated]
             ).arrange(DOWN, aligned_edge=LEFT, buff=0.2)
             undated_block = VGroup(undated_title, undated_lines).arrange(DOWN, buff=0.2)
             undated_block.to_edge(RIGHT, buff=0.6).shift(DOWN * 2.2)
@@ -1178,34 +860,15 @@ class GanttTimelineLevel2(Scene):
         self.play(FadeIn(counter_boxes), run_time=0.6)
 
         # Animacion: avanzar desde 06/01 hasta hoy, flips en paralelo
-        def _prepare_flip(block: dict[str, object], new_value: str) -> tuple[list[Animation], VGroup, VGroup]:
-            old_card: VGroup = block["card"]  # type: ignore[assignment]
-            drop = 0.12 * counter_scale
-            new_text = Text(
-                new_value, font_size=16 * counter_scale, weight=BOLD, color=WHITE, font="DejaVu Sans Mono"
-            )
-            new_text.move_to(old_card[4].get_center())
-            new_card = VGroup(
-                old_card[0].copy(),
-                old_card[1].copy(),
-                old_card[2].copy(),
-                old_card[3].copy(),
-                new_text,
-            )
-            new_card.move_to(old_card.get_center() + UP * drop)
-            new_card.set_opacity(0)
-            self.add(new_card)
-            anims = [
-                old_card.animate.shift(DOWN * drop).set_opacity(0),
-                new_card.animate.shift(DOWN * drop).set_opacity(1),
-            ]
-            return anims, old_card, new_card
         self.play(Create(timeline), run_time=0.8)
-        red_glow = always_redraw(
-            lambda: _red_glow_at(
+        # Se construye una vez y solo se desplaza (antes se rehacía en cada frame con always_redraw).
+        red_glow = _red_glow_at(0.0)
+        red_glow.add_updater(
+            lambda m: m.set_x(
                 (_x_from_pct(real_tracker.get_value()) + _x_from_pct(plan_tracker.get_value())) / 2
             )
         )
+        red_glow.update()
         self.play(FadeIn(tlu_label), FadeIn(tmd_label), FadeIn(red_glow), run_time=0.4)
         self.play(LaggedStartMap(FadeIn, points, lag_ratio=0.05), run_time=0.9)
         self.play(LaggedStartMap(FadeIn, stems_bg, lag_ratio=0.05), run_time=1.0)
@@ -1235,8 +898,6 @@ class GanttTimelineLevel2(Scene):
         # Mostrar valores reales después de la prueba (ahora animados día a día)
         if stems_lit:
             stems_lit.set_opacity(0)
-        if bar_lit:
-            bar_lit.set_opacity(1)
 
         if undated_block:
             self.play(FadeIn(undated_block), run_time=0.6)
@@ -1246,49 +907,89 @@ class GanttTimelineLevel2(Scene):
         days_tracker = ValueTracker(start_day_count)
         real_tracker.set_value(start_real)
         plan_tracker.set_value(start_plan)
-        for seg in day_segments_map.get(start_day_count, []):
-            seg.set_opacity(1)
+        if bar_lit.size:
+            bar_lit.set_lit(start_day_count)
+            self.add(bar_lit)
         if stems_lit:
             stems_lit.set_opacity(start_day_count / max(1, days_total))
 
         # Dial de "hoy" en movimiento (TLD)
-        x_start = date_to_x(datetime.combine(start_date, datetime.min.time()))
+        x_start = date_to_x(start_date)
         x_shift = x_start - x_today
         if today_line:
             today_line.shift(RIGHT * x_shift)
             self.play(FadeIn(today_line), run_time=0.2)
 
-        days_to_advance = (today_dt.date() - start_date).days
+        days_to_advance = len(series) - 1
         flip_time = 1.0
-        if days_to_advance > 0:
+        if days_to_advance > 0 and engine == "tracker":
+            # Un solo play: el costo depende del largo del video, no de los días del calendario.
+            date_tracker = ValueTracker(0)
+            steps = np.arange(len(series), dtype=np.float64)
+
+            def _counter_values_at(step: int) -> list[str]:
+                day = series.date(step)
+                return [
+                    _fmt2(int(round(series.real[step]))),
+                    _fmt2(int(round(series.plan[step]))),
+                    _fmt2(int(round(series.days_pct[step]))),
+                    _fmt2(int(series.days[step])),
+                    _fmt2(day.day),
+                    _fmt2(day.month),
+                    f"{day.year:04d}",
+                ]
+
+            def _sync_day(_mob: Mobject) -> None:
+                t = date_tracker.get_value()
+                step = min(days_to_advance, int(t + 1e-9))
+                real_tracker.set_value(float(np.interp(t, steps, series.real)))
+                plan_tracker.set_value(float(np.interp(t, steps, series.plan)))
+                for counter, value in zip(counter_blocks, _counter_values_at(step)):
+                    counter.set_value(value)
+                bar_lit.set_lit(int(series.days[step]))
+                if stems_lit:
+                    stems_lit.set_opacity(float(np.interp(t, steps, series.ratio)))
+
+            # El driver va al fondo para que sus updaters corran antes que el dial (always_redraw).
+            driver = Mobject()
+            driver.add_updater(_sync_day)
+            self.add(driver, date_tracker)
+            self.bring_to_back(driver)
+            self.play(
+                date_tracker.animate.set_value(days_to_advance),
+                run_time=max(flip_time, days_to_advance / max(days_per_second, 1e-6)),
+                rate_func=linear,
+            )
+            _sync_day(driver)
+            driver.clear_updaters()
+            self.remove(driver, date_tracker)
+        elif days_to_advance > 0:
             current_x = x_start
-            for _ in range(days_to_advance):
-                next_date = current_date + timedelta(days=1)
-                new_x = date_to_x(datetime.combine(next_date, datetime.min.time()))
+            for step in range(1, len(series)):
+                next_date = series.date(step)
+                new_x = date_to_x(next_date)
                 anims: list[Animation] = []
                 # dial se mueve por % (trackers), no por desplazamiento fijo
 
-                flips: list[tuple[dict[str, object], str]] = []
+                flips: list[tuple[FlipCounter, str]] = []
                 flips.append((counter_blocks[4], _fmt2(next_date.day)))
 
-                next_day_date = _as_date(next_date)
-                if next_day_date.weekday() < 5 and next_day_date not in HOLIDAYS_2026:
-                    next_day = min(days_total, int(days_tracker.get_value() + 1))
-                    next_pct = min(target_pct, (target_pct / days_total) * next_day)
+                if series.business[step]:
+                    next_day = int(series.days[step])
+                    next_pct = float(series.days_pct[step])
                     anims.append(days_tracker.animate.set_value(next_day))
                     anims.append(pct_tracker.animate.set_value(next_pct))
-                    next_real = min(real_pct_val, (real_pct_val / days_total) * next_day)
-                    next_plan = min(planned_pct_val, (planned_pct_val / days_total) * next_day)
+                    next_real = float(series.real[step])
+                    next_plan = float(series.plan[step])
                     flips.append((counter_blocks[0], _fmt2(int(round(next_real)))))
                     flips.append((counter_blocks[1], _fmt2(int(round(next_plan)))))
                     anims.append(real_tracker.animate.set_value(next_real))
                     anims.append(plan_tracker.animate.set_value(next_plan))
                     flips.append((counter_blocks[2], _fmt2(int(round(next_pct)))))
                     flips.append((counter_blocks[3], _fmt2(next_day)))
-                    for seg in day_segments_map.get(next_day, []):
-                        anims.append(seg.animate.set_opacity(1))
+                    bar_lit.set_lit(next_day)
                     if stems_lit:
-                        progress_ratio = next_day / max(1, days_total)
+                        progress_ratio = float(series.ratio[step])
                         anims.append(stems_lit.animate.set_opacity(progress_ratio))
 
                 if next_date.month != current_date.month:
@@ -1296,18 +997,12 @@ class GanttTimelineLevel2(Scene):
                 if next_date.year != current_date.year:
                     flips.append((counter_blocks[6], f"{next_date.year:04d}"))
 
-                flip_updates: list[tuple[dict[str, object], VGroup, VGroup]] = []
-                for block, value in flips:
-                    flip_anims, old_card, new_card = _prepare_flip(block, value)
-                    anims.extend(flip_anims)
-                    flip_updates.append((block, old_card, new_card))
+                for counter, value in flips:
+                    anims.extend(counter.flip_to(value))
 
                 self.play(*anims, run_time=flip_time)
-                for block, old_card, new_card in flip_updates:
-                    block["group"].remove(old_card)  # type: ignore[call-arg]
-                    self.remove(old_card)
-                    block["group"].add(new_card)  # type: ignore[call-arg]
-                    block["card"] = new_card
+                for counter, _value in flips:
+                    counter.settle()
 
                 current_date = next_date
                 current_x = new_x
@@ -1323,28 +1018,17 @@ class GanttTimelineCircular(ThreeDScene):
 
         title_text = "Hablitación Plataforma Calypso Banco BCI"
         subtitle_text = "Ambiente Pre Productivo"
-        level0 = next((row for row in tasks if row[1] == 0), None)
-        level1 = next((row for row in tasks if row[1] == 1), None)
+        level0 = next((task for task in tasks if task.level == 0), None)
+        level1 = next((task for task in tasks if task.level == 1), None)
         if level0:
-            title_text = level0[2]
+            title_text = level0.name
         if level1:
-            subtitle_text = level1[2]
-
-        tasks = [row for row in tasks if row[1] >= 2]
-
-        dated = []
-        for row in tasks:
-            task_id, _, name, *_rest, start, end, _pct, _dur, _pred = row
-            if start and end:
-                dated.append(
-                    {
-                        "id": task_id,
-                        "name": name,
-                        "start": datetime.strptime(start, "%d/%m/%y"),
-                    }
-                )
+            subtitle_text = level1.name
+
+        tasks = [task for task in tasks if task.level >= 2]
 
-        dated.sort(key=lambda t: t["start"])
+        dated = [task for task in tasks if task.start and task.end]
+        dated.sort(key=lambda t: t.start)
 
         title = Text(title_text, font_size=26, weight=BOLD)
         subtitle = Text(subtitle_text, font_size=16, color=GRAY_B)
@@ -1375,25 +1059,25 @@ class GanttTimelineCircular(ThreeDScene):
         points = VGroup()
         labels = VGroup()
         if dated:
-            start_min = min(t["start"] for t in dated)
-            end_max = max(t["start"] for t in dated)
+            start_min = min(t.start for t in dated)
+            end_max = max(t.start for t in dated)
         else:
-            start_min = datetime.now()
-            end_max = datetime.now()
+            start_min = date.today()
+            end_max = date.today()
 
-        def date_to_angle(value: datetime) -> float:
+        def date_to_angle(value: date) -> float:
             total = (end_max - start_min).days or 1
             offset = (value - start_min).days
             ratio = offset / total
             return outer.start_angle + outer.angle * ratio
 
         for idx, task in enumerate(dated):
-            ang = date_to_angle(task["start"])
+            ang = date_to_angle(task.start)
             radius = 2.9
             pos = radius * np.array([np.cos(ang), np.sin(ang), 0])
             points.add(Dot(pos, radius=0.05, color=BLUE_D))
 
-            label = Text(f"ID {task['id']}", font_size=12, color=GRAY_B)
+            label = Text(f"ID {task.id}", font_size=12, color=GRAY_B)
             label.move_to((radius + 0.45) * np.array([np.cos(ang), np.sin(ang), 0]))
             label.rotate(ang + PI / 2)
             labels.add(label)
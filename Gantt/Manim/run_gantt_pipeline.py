@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
 import shutil
@@ -10,7 +11,7 @@ from pathlib import Path
 
 
 def extract_filter_args(argv: list[str]) -> tuple[list[str], list[str]]:
-    """Extrae --nivel/--id en el orden recibido y retorna (filtros, resto)."""
+    """Extrae --nivel/--id/--where en el orden recibido y retorna (filtros, resto)."""
     filters: list[str] = []
     rest: list[str] = []
     i = 0
@@ -20,7 +21,7 @@ def extract_filter_args(argv: list[str]) -> tuple[list[str], list[str]]:
             filters.append(arg)
             i += 1
             continue
-        if arg in ("--nivel", "--id"):
+        if arg in ("--nivel", "--id", "--where"):
             if i + 1 >= len(argv):
                 raise SystemExit(f"Error: {arg} requiere un valor.")
             filters.extend([arg, argv[i + 1]])
@@ -41,6 +42,12 @@ def build_filter_args(args: argparse.Namespace, filter_args: list[str], script_p
         cmd.append("--debug")
     if args.output is not None:
         cmd += ["--output", str(args.output)]
+    if args.no_cache:
+        cmd.append("--no-cache")
+    if args.cpm:
+        cmd.append("--cpm")
+    if args.calendario:
+        cmd += ["--calendario", args.calendario]
     return cmd
 
 
@@ -173,6 +180,23 @@ def main() -> int:
         action="store_true",
         help="Al usar --id, expande solo el siguiente nivel del ID desde el XLSX completo.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usa la cache del XLSX parseado (siempre relee el archivo).",
+    )
+    parser.add_argument(
+        "--cpm",
+        action="store_true",
+        help="Imprime la ruta crítica (CPM sobre Predecesores) antes de renderizar.",
+    )
+    parser.add_argument(
+        "--calendario",
+        help=(
+            "Feriados del proyecto (ej: CL o CL,PE). Por defecto se usa la clave "
+            "calendario: de run_gantt_pipeline.parametros."
+        ),
+    )
     parser.add_argument(
         "--keep-scene",
         type=Path,
@@ -228,7 +252,10 @@ def main() -> int:
 
     manim_cmd = build_manim_args(args, script_path)
     print("Ejecutando:", " ".join(manim_cmd))
-    result = subprocess.run(manim_cmd)
+    env = dict(os.environ)
+    if args.calendario:
+        env["GANTT_CALENDARIO"] = args.calendario
+    result = subprocess.run(manim_cmd, env=env)
     if result.returncode != 0:
         return result.returncode
 
@@ -0,0 +1,49 @@
+"""
+Fixtures comunes. Los módulos sin Manim (gantt_calendar, gantt_schedule,
+gantt_progress, gantt_tasks) corren siempre; el script de escenas solo se carga
+si Manim está instalado.
+"""
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+MANIM_DIR = Path(__file__).resolve().parent.parent
+XLSX_DIR = MANIM_DIR.parent / "Smartsheets" / "XLSX"
+SCRIPT = MANIM_DIR / "gantt_timeline_v4.0.1.py"
+
+sys.path.insert(0, str(MANIM_DIR))
+
+
+@pytest.fixture(scope="session")
+def gantt_tasks(tmp_path_factory):
+    """
+    gantt_tasks con las caches en un directorio temporal. CACHE_DIR se fija al
+    importar, así que el módulo se importa de nuevo con GANTT_CACHE_DIR apuntando
+    allí; al terminar la sesión se restauran la variable y el módulo anterior.
+    """
+    previous = sys.modules.pop("gantt_tasks", None)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("GANTT_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield importlib.import_module("gantt_tasks")
+    sys.modules.pop("gantt_tasks", None)
+    if previous is not None:
+        sys.modules["gantt_tasks"] = previous
+
+
+@pytest.fixture(scope="session")
+def gantt(gantt_tasks):
+    """gantt_timeline_v4.0.1.py como módulo (usa el mismo gantt_tasks de la fixture)."""
+    pytest.importorskip("manim")
+    spec = importlib.util.spec_from_file_location("gantt_timeline", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def workbooks():
+    return sorted(XLSX_DIR.glob("*.xlsx"))
@@ -0,0 +1,140 @@
+"""BusinessCalendar (escalar y por lote) contra numpy.busday_* con los feriados de feriados.csv."""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from gantt_calendar import BusinessCalendar, CalendarRegistry
+
+TRIALS = 3000
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return CalendarRegistry().calendar("CL")
+
+
+@pytest.fixture(scope="module")
+def holidays():
+    return np.array(sorted(CalendarRegistry().holidays("CL")), dtype="datetime64[D]")
+
+
+@pytest.fixture(scope="module")
+def spans(holidays):
+    """Pares (inicio, fin) al azar, con extremos en feriados, invertidos y de largo cero."""
+    rng = random.Random(2026)
+    base = date(2025, 10, 1)
+    hol = [d.item() for d in holidays]
+    starts, ends = [], []
+    for i in range(TRIALS):
+        start = rng.choice(hol) if i % 5 == 0 else base + timedelta(rng.randint(0, 900))
+        end = rng.choice(hol) if i % 7 == 0 else start + timedelta(rng.randint(-40, 250))
+        starts.append(start)
+        ends.append(end)
+    return np.array(starts, dtype="datetime64[D]"), np.array(ends, dtype="datetime64[D]")
+
+
+def test_count_many_matches_busday_count(calendar, holidays, spans):
+    starts, ends = spans
+    expected = np.where(ends >= starts, np.busday_count(starts, ends + 1, holidays=holidays), 0)
+    assert np.array_equal(calendar.count_many(starts, ends), expected)
+
+
+def test_between_matches_busday_count(calendar, holidays, spans):
+    starts, ends = spans
+    expected = np.busday_count(starts, ends, holidays=holidays)
+    got = [calendar.between(a.item(), b.item()) for a, b in zip(starts, ends)]
+    assert got == expected.tolist()
+
+
+def test_offset_matches_busday_offset(calendar, holidays, spans):
+    starts, _ends = spans
+    rng = random.Random(7)
+    steps = np.array([rng.randint(-60, 120) for _ in starts])
+    expected = np.busday_offset(starts, steps, roll="forward", holidays=holidays)
+    got = [calendar.offset(d.item(), int(n)) for d, n in zip(starts, steps)]
+    assert got == [d.item() for d in expected]
+
+
+def test_elapsed_fraction_many(calendar, holidays, spans):
+    starts, ends = spans
+    today = date(2026, 10, 17)
+    t = np.datetime64(today, "D")
+    total = np.maximum(1, np.busday_count(starts, ends, holidays=holidays))
+    elapsed = np.busday_count(starts, np.clip(t, starts, np.maximum(starts, ends)), holidays=holidays)
+    expected = np.where(t < starts, 0.0, np.where(t >= ends, 1.0, elapsed / total))
+    assert np.allclose(calendar.elapsed_fraction_many(starts, ends, today), expected)
+
+
+def test_nat_gives_zero_or_nan(calendar):
+    starts = np.array(["2026-03-02", "NaT", "2026-03-02"], dtype="datetime64[D]")
+    ends = np.array(["2026-03-06", "2026-03-06", "NaT"], dtype="datetime64[D]")
+    assert calendar.count_many(starts, ends).tolist() == [5, 0, 0]
+    assert calendar.weekdays_count_many(starts, ends).tolist() == [4, 0, 0]
+    fractions = calendar.elapsed_fraction_many(starts, ends, date(2026, 3, 4))
+    assert fractions[0] == pytest.approx(0.5)
+    assert np.isnan(fractions[1:]).all()
+
+
+def test_span_counts_match_scalar(calendar, spans):
+    starts, ends = spans
+    weekdays = calendar.weekdays_count_many(starts, ends)
+    hols = calendar.holidays_count_many(starts, ends)
+    for i in range(0, TRIALS, 10):
+        a, b = starts[i].item(), ends[i].item()
+        assert weekdays[i] == calendar.weekdays_count(a, b)
+        assert hols[i] == calendar.holidays_count(a, b)
+
+
+def test_spans_match_scalar(calendar, holidays):
+    hol = [d.item() for d in holidays]
+    keys = sorted({date(2026, 1, 6), *hol[:6], date(2026, 6, 1), date(2026, 12, 31), date(2027, 2, 3)})
+    weekdays, holidays_by_span = calendar.spans(keys)
+    assert len(weekdays) == len(keys) - 1
+    for i in range(1, len(keys)):
+        assert weekdays[i - 1] == calendar.weekdays_in_span(keys[i - 1], keys[i])
+        assert holidays_by_span[i - 1] == calendar.holidays_in_span(keys[i - 1], keys[i])
+    assert calendar.spans(keys[:1]) == ([], [])
+
+
+@pytest.mark.parametrize(
+    "method",
+    ["count_many", "weekdays_count_many", "holidays_count_many", "elapsed_fraction_many", "spans"],
+)
+def test_batch_outside_horizon(holidays, method):
+    """Los extremos fuera del horizonte compilado lo amplían una vez, antes de calcular offsets."""
+    hol = [d.item() for d in holidays]
+    starts = np.array(["2026-03-02", "2023-06-01", "2026-03-02", "2029-01-02"], dtype="datetime64[D]")
+    ends = np.array(["2029-03-06", "2026-03-06", "2026-03-06", "2030-02-01"], dtype="datetime64[D]")
+
+    def fresh():
+        calendar = BusinessCalendar(hol, start=date(2026, 1, 1), end=date(2027, 1, 1))
+        assert calendar.start > date(2023, 6, 1) and calendar.end < date(2029, 3, 6)
+        return calendar
+
+    scalar = fresh()
+    pairs = [(a.item(), b.item()) for a, b in zip(starts, ends)]
+    if method == "count_many":
+        got = fresh().count_many(starts, ends)
+        assert got.tolist() == np.busday_count(starts, ends + 1, holidays=holidays).tolist()
+        assert got.tolist() == [scalar.count(a, b) for a, b in pairs]
+    elif method == "weekdays_count_many":
+        got = fresh().weekdays_count_many(starts, ends)
+        assert got.tolist() == [scalar.weekdays_count(a, b) for a, b in pairs]
+    elif method == "holidays_count_many":
+        got = fresh().holidays_count_many(starts, ends)
+        assert got.tolist() == [scalar.holidays_count(a, b) for a, b in pairs]
+    elif method == "elapsed_fraction_many":
+        today = date(2028, 6, 1)
+        total = np.maximum(1, np.busday_count(starts, ends, holidays=holidays))
+        t = np.datetime64(today, "D")
+        elapsed = np.busday_count(starts, np.clip(t, starts, ends), holidays=holidays)
+        expected = np.where(t < starts, 0.0, np.where(t >= ends, 1.0, elapsed / total))
+        assert np.allclose(fresh().elapsed_fraction_many(starts, ends, today), expected)
+    else:
+        keys = [date(2023, 6, 1), date(2026, 3, 2), date(2029, 3, 6)]
+        weekdays, holidays_by_span = fresh().spans(keys)
+        assert weekdays == [scalar.weekdays_in_span(a, b) for a, b in zip(keys, keys[1:])]
+        assert holidays_by_span == [scalar.holidays_in_span(a, b) for a, b in zip(keys, keys[1:])]
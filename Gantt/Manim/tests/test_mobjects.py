@@ -0,0 +1,155 @@
+"""
+Humo sin ventana de la escena y de los mobjects reutilizables. Requieren Manim
+(fixture `gantt`); sin Manim se saltan.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+WINDOW_DAYS = 12
+
+
+@pytest.fixture
+def tasks_file(gantt_tasks, workbooks, tmp_path, monkeypatch):
+    """Tareas del primer XLSX en un .tasks temporal, apuntado por GANTT_TASKS."""
+    if not workbooks:
+        pytest.skip("sin XLSX de ejemplo")
+    out = tmp_path / "smoke.tasks"
+    gantt_tasks.write_tasks_file(gantt_tasks.load_tasks_from_xlsx(workbooks[0]), out)
+    monkeypatch.setenv("GANTT_TASKS", str(out))
+    return out
+
+
+@pytest.mark.parametrize("engine", ["tracker", "pasos"])
+def test_level2_engines_render(gantt, tasks_file, tmp_path, monkeypatch, engine):
+    from manim import tempconfig
+
+    # Ventana corta para que el motor "pasos" (un play por día) no tarde.
+    monkeypatch.setattr(gantt, "tld_window", lambda now: (now - timedelta(days=WINDOW_DAYS), now))
+    monkeypatch.setenv("GANTT_DAY_ENGINE", engine)
+    monkeypatch.setenv("GANTT_DAYS_PER_SECOND", "50")
+    with tempconfig({"dry_run": True, "quality": "low_quality", "media_dir": str(tmp_path)}):
+        scene = gantt.GanttTimelineLevel2()
+        scene.render()
+
+    today = date.today()
+    counters = [m for top in scene.mobjects for m in top.get_family() if isinstance(m, gantt.FlipCounter)]
+    assert len(counters) == 7
+    assert [c.value for c in counters[4:]] == [f"{today.day:02d}", f"{today.month:02d}", f"{today.year:04d}"]
+    # Tras el flip no quedan glifos salientes colgando.
+    assert all(len(c.submobjects) == 3 for c in counters)
+
+
+def test_level2_rejects_unknown_engine(gantt, tasks_file, tmp_path, monkeypatch):
+    from manim import tempconfig
+
+    monkeypatch.setenv("GANTT_DAY_ENGINE", "traker")
+    with tempconfig({"dry_run": True, "quality": "low_quality", "media_dir": str(tmp_path)}):
+        with pytest.raises(ValueError, match="GANTT_DAY_ENGINE"):
+            gantt.GanttTimelineLevel2().construct()
+
+
+def test_flip_counter_set_value_and_flip(gantt):
+    FlipCounter = gantt.FlipCounter
+    counter = FlipCounter("Real %", "05", width=0.87, height=0.5, scale=1.4, dot_color=gantt.GREEN_E)
+    size = counter.font_size
+    assert len(counter.digits) == 2
+    assert ("5", size) in FlipCounter._glyphs
+    assert counter.digits[1] is not FlipCounter._glyphs[("5", size)]
+
+    first = counter.digits[0]
+    counter.set_value("07")
+    assert counter.value == "07"
+    assert counter.digits[0] is first  # el glifo que no cambia no se reemplaza
+    assert ("7", size) in FlipCounter._glyphs
+
+    cached = len(FlipCounter._glyphs)
+    FlipCounter("Plan %", "57", width=0.87, height=0.5, scale=1.4)
+    assert len(FlipCounter._glyphs) == cached
+
+    anims = counter.flip_to("08")
+    assert len(anims) == 2
+    assert counter.value == "08"
+    assert len(counter.submobjects) == 4
+    counter.settle()
+    assert len(counter.submobjects) == 3
+    assert counter.flip_to("08") == []
+
+
+def test_faded_line_stroke_stops(gantt):
+    line = gantt.FadedLine([0, 0, 0], [2, 0, 0])
+    assert line.submobjects == []
+    assert np.allclose(line.get_stroke_rgbas()[:, 3], [1.0, 0.1, 1.0])
+    assert np.allclose(line.get_sheen_direction(), gantt.RIGHT)
+
+    line.set_x(3)  # lo que hace el updater del brillo rojo
+    assert np.allclose(line.get_stroke_rgbas()[:, 3], [1.0, 0.1, 1.0])
+
+    down = gantt.FadedLine([0, 1, 0], [0, -1, 0], opacities=(0.2, 1.0))
+    assert np.allclose(down.get_stroke_rgbas()[:, 3], [0.2, 1.0])
+    assert np.allclose(down.get_sheen_direction(), gantt.DOWN)
+
+
+def test_star_burst_cache(gantt, monkeypatch):
+    StarBurst = gantt.StarBurst
+    monkeypatch.setattr(StarBurst, "_cache", {})
+    a = StarBurst.at(0, 0, gantt.RED_E, 42, 0.05)
+    template = StarBurst._cache[(str(gantt.RED_E), 42, 0.05, 0)]
+    b = StarBurst.at(1, 2, gantt.RED_E, 42, 0.05)
+    assert len(StarBurst._cache) == 1
+    assert StarBurst._cache[(str(gantt.RED_E), 42, 0.05, 0)] is template
+    assert a is not template and b is not template and a is not b
+    assert np.allclose(b.get_center() - a.get_center(), [1, 2, 0])
+
+    # 4 * STEPS puntos como subpaths; el primer paso (brazos vecinos superpuestos)
+    # va en dos mobjects para que la opacidad se acumule como con Dot separados.
+    assert sum(len(ring.get_subpaths()) for ring in a) == len(StarBurst.ARMS) * StarBurst.STEPS
+    assert len(a.submobjects) == StarBurst.STEPS + 1
+    for ring in a:
+        centers = [path[:, :2].mean(axis=0) for path in ring.get_subpaths()]
+        circles = [(c, np.linalg.norm(path[0, :2] - c)) for c, path in zip(centers, ring.get_subpaths())]
+        for j, (c1, r1) in enumerate(circles):
+            for c2, r2 in circles[j + 1 :]:
+                assert np.linalg.norm(c1 - c2) >= r1 + r2 - 1e-6
+    opacities = [ring.get_fill_opacity() for ring in a]
+    assert opacities == sorted(opacities, reverse=True)
+
+    StarBurst.at(0, 0, gantt.RED_E, 42, 0.05, draw=1)
+    StarBurst.at(0, 0, gantt.BLUE_D, 42, 0.05)
+    assert len(StarBurst._cache) == 3
+
+
+def test_segmented_bar_set_lit(gantt):
+    colors = [gantt.RED_E, gantt.GREEN_B, gantt.BLUE_E, gantt.BLUE_E]
+    bar = gantt.SegmentedBar([2.0, 0.0, 1.0, 1.6], [0.5] * 4, 0.0, 0.2, colors, keys=[3, 1, 2, 2])
+
+    def shown(bar):
+        return {tuple(np.round(child.get_fill_color().to_rgb(), 6)): len(child.points) // 16 for child in bar}
+
+    def rgb(color):
+        return tuple(np.round(gantt.ManimColor(color).to_rgb(), 6))
+
+    # Un hijo de relleno sólido por color: sin gradiente que mezcle segmentos vecinos.
+    assert bar.size == 4
+    assert len(bar.submobjects) == 3
+    assert all(len(child.get_fill_rgbas()) == 1 for child in bar)
+    assert shown(bar) == {rgb(gantt.RED_E): 1, rgb(gantt.GREEN_B): 1, rgb(gantt.BLUE_E): 2}
+    assert bar.width == pytest.approx(2.5)
+    assert bar.height == pytest.approx(0.2)
+
+    bar.set_lit(0)
+    assert sum(len(child.points) for child in bar) == 0
+    bar.set_lit(2)
+    assert shown(bar) == {rgb(gantt.RED_E): 0, rgb(gantt.GREEN_B): 1, rgb(gantt.BLUE_E): 2}
+    blue = next(child for child in bar if len(child.points) == 32)
+    assert len(blue.get_subpaths()) == 2
+    assert blue.get_left()[0] == pytest.approx(1.0)
+    assert blue.get_right()[0] == pytest.approx(2.1)
+    bar.set_lit(None)
+    assert sum(len(child.points) for child in bar) == 4 * 16
+
+    plain = gantt.SegmentedBar([0.0, 1.0], [0.5, 0.5], 0.0, 0.2, [gantt.GRAY_C] * 2, opacity=0.32)
+    assert len(plain.submobjects) == 1
+    assert plain[0].get_fill_opacity() == pytest.approx(0.32)
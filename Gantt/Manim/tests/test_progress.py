@@ -0,0 +1,85 @@
+"""Serie diaria (gantt_progress.daily_series) contra el bucle día a día original de la escena."""
+
+import csv
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from gantt_calendar import CalendarRegistry
+from gantt_progress import CSV_COLUMNS, daily_series
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return CalendarRegistry().calendar("CL")
+
+
+def replay(calendar, start, end, real_target, plan_target, days_target):
+    """El bucle de GanttTimelineLevel2 antes de precalcular la serie, paso a paso."""
+    days_total = max(1, calendar.count(start, end))
+    day = 1 if calendar.is_business_day(start) else 0
+    rows = [(start, calendar.is_business_day(start), day)]
+    current = start
+    while current < end:
+        current += timedelta(days=1)
+        business = calendar.is_business_day(current)
+        if business:
+            day = min(days_total, day + 1)
+        rows.append((current, business, day))
+
+    def grow(target, n):
+        return min(target, (target / days_total) * n)
+
+    return days_total, [
+        (d, business, n, grow(real_target, n), grow(plan_target, n), grow(days_target, n))
+        for d, business, n in rows
+    ]
+
+
+@pytest.mark.parametrize(
+    "start,end",
+    [
+        (date(2026, 1, 6), date(2026, 10, 17)),  # ventana TLD: fines de semana y feriados
+        (date(2026, 3, 28), date(2026, 4, 12)),  # Semana Santa (03/04) entre fines de semana
+        (date(2026, 12, 20), date(2027, 1, 10)),  # cruce de año con 25/12 y 01/01
+        (date(2026, 1, 6), date(2026, 1, 6)),
+    ],
+)
+def test_series_matches_replay(calendar, start, end):
+    days_total, rows = replay(calendar, start, end, 37, 88, 19.0)
+    series = daily_series(calendar, start, end, 37, 88, 19.0)
+    assert series.days_total == days_total
+    assert len(series) == len(rows)
+    for i, (d, business, n, real, plan, days_pct) in enumerate(rows):
+        assert series.date(i) == d
+        assert bool(series.business[i]) == business
+        assert series.days[i] == n
+        assert series.real[i] == pytest.approx(real)
+        assert series.plan[i] == pytest.approx(plan)
+        assert series.days_pct[i] == pytest.approx(days_pct)
+
+
+def test_non_business_days_do_not_move(calendar):
+    series = daily_series(calendar, date(2026, 1, 6), date(2026, 10, 17), 37, 88, 19.0)
+    still = ~series.business[1:]
+    assert np.array_equal(series.days[1:][still], series.days[:-1][still])
+    assert np.array_equal(series.real[1:][still], series.real[:-1][still])
+    assert series.days[-1] == series.days_total
+    assert series.real[-1] == pytest.approx(37)
+
+
+def test_end_before_start_is_one_row(calendar):
+    series = daily_series(calendar, date(2026, 1, 6), date(2026, 1, 3), 10, 10, 10)
+    assert len(series) == 1
+
+
+def test_write_csv(calendar, tmp_path):
+    series = daily_series(calendar, date(2026, 3, 30), date(2026, 4, 5), 10, 20, 19.0)
+    out = tmp_path / "serie.csv"
+    series.write_csv(out)
+    with out.open(encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == CSV_COLUMNS
+    assert len(rows) == len(series) + 1
+    assert rows[5][0] == "2026-04-03" and rows[5][1] == "0"  # Viernes Santo
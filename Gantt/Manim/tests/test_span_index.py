@@ -0,0 +1,76 @@
+"""SpanIndex contra búsqueda por fuerza bruta."""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from gantt_progress import _LEAF_SIZE, SpanIndex
+
+
+def make_spans(n, seed):
+    """n tramos al azar; cada 7 sin inicio (NaT) y algunos con fin < inicio."""
+    rng = random.Random(seed)
+    starts, ends = [], []
+    for i in range(n):
+        start = date(2026, 1, 1) + timedelta(rng.randint(0, 300))
+        end = start + timedelta(rng.randint(-3, 60))
+        starts.append(None if i % 7 == 0 else start)
+        ends.append(end)
+    return starts, ends
+
+
+def to_array(days):
+    return np.array([d or "NaT" for d in days], dtype="datetime64[D]")
+
+
+def brute_active(starts, ends, day):
+    return [i for i, (s, e) in enumerate(zip(starts, ends)) if s and s <= day <= e]
+
+
+def brute_overlapping(starts, ends, first, last):
+    if last < first:
+        return []
+    return [i for i, (s, e) in enumerate(zip(starts, ends)) if s and s <= e and s <= last and e >= first]
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, _LEAF_SIZE, _LEAF_SIZE + 1, 40, 500])
+def test_matches_brute_force(n):
+    starts, ends = make_spans(n, seed=n)
+    index = SpanIndex(to_array(starts), to_array(ends))
+    assert len(index) == sum(1 for s, e in zip(starts, ends) if s and e >= s)
+
+    rng = random.Random(n + 1)
+    queries = [date(2025, 12, 20) + timedelta(k) for k in range(0, 400, 3)]
+    counts = index.count_active(queries)
+    ended = index.count_ended(queries)
+    for day, count, done in zip(queries, counts, ended):
+        assert done == sum(1 for s, e in zip(starts, ends) if s and s <= e <= day)
+        expected = brute_active(starts, ends, day)
+        assert index.active(day) == expected
+        assert count == len(expected)
+
+        last = day + timedelta(rng.randint(-5, 30))
+        expected = brute_overlapping(starts, ends, day, last)
+        assert index.overlapping(day, last) == expected
+        assert index.count_overlapping(day, last) == len(expected)
+
+
+def test_nat_and_reversed_spans_are_ignored():
+    starts = to_array([date(2026, 3, 1), None, date(2026, 3, 10), date(2026, 3, 5)])
+    ends = to_array([date(2026, 3, 20), date(2026, 3, 20), None, date(2026, 3, 1)])
+    index = SpanIndex(starts, ends)
+    assert len(index) == 1
+    assert index.active(date(2026, 3, 10)) == [0]
+    assert index.count_active([date(2026, 3, 10)]).tolist() == [1]
+
+
+def test_empty_index():
+    index = SpanIndex(to_array([]), to_array([]))
+    assert len(index) == 0
+    assert index.active(date(2026, 3, 1)) == []
+    assert index.overlapping(date(2026, 3, 1), date(2026, 4, 1)) == []
+    assert index.count_overlapping(date(2026, 3, 1), date(2026, 4, 1)) == 0
+    assert index.count_active([date(2026, 3, 1)]).tolist() == [0]
+    assert index.count_ended([date(2026, 3, 1)]).tolist() == [0]
@@ -0,0 +1,90 @@
+"""Lectura de argumentos, rollup y cálculos de avance de gantt_tasks (sin Manim)."""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from gantt_calendar import CalendarRegistry
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    [
+        ("58:duracion=3d", (58, None, 3)),
+        ("58:duracion=1,5d", (58, None, 2)),  # coma decimal, como duration_days
+        ("58: duracion = 2.5", (58, None, 3)),
+        ("8:inicio=2026-03-02", (8, date(2026, 3, 2), None)),
+        ("58:duracion=1,5d,inicio=02/03/2026", (58, date(2026, 3, 2), 2)),
+        ("58:inicio=02/03/2026, duracion=3", (58, date(2026, 3, 2), 3)),
+    ],
+)
+def test_parse_what_if(gantt_tasks, spec, expected):
+    assert gantt_tasks.parse_what_if(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["58", "58:", "x:duracion=3", "58:duracion=tres", "58:color=rojo", "58:duracion=1,,5d"])
+def test_parse_what_if_rejects(gantt_tasks, spec):
+    with pytest.raises(SystemExit):
+        gantt_tasks.parse_what_if(spec)
+
+
+def test_rollup_keeps_sheet_values_without_dated_children(gantt_tasks):
+    Task = gantt_tasks.Task
+    tasks = [
+        Task(1, 0, "Proyecto", start=date(2026, 1, 5), end=date(2026, 12, 18), pct=10.0),
+        Task(2, 1, "Fase sin fechas", start=date(2026, 2, 2), end=date(2026, 3, 6), pct=40.0),
+        Task(3, 2, "Detalle sin fechas"),
+        Task(4, 1, "Fase con fechas", start=date(2026, 1, 1), end=date(2026, 1, 2), pct=0.0),
+        Task(5, 2, "Detalle", start=date(2026, 4, 1), end=date(2026, 4, 30), pct=100.0, duration="22d"),
+    ]
+    rolled = gantt_tasks.rollup_tasks(tasks)
+    assert set(rolled) == {id(tasks[0]), id(tasks[1]), id(tasks[3])}
+
+    phase = rolled[id(tasks[1])]
+    assert (phase.start, phase.end, phase.pct) == (date(2026, 2, 2), date(2026, 3, 6), 40.0)
+    dated = rolled[id(tasks[3])]
+    assert (dated.start, dated.end, dated.pct) == (date(2026, 4, 1), date(2026, 4, 30), 100.0)
+    # Los valores conservados de la fase también cuentan para el proyecto.
+    project = rolled[id(tasks[0])]
+    assert (project.start, project.end) == (date(2026, 2, 2), date(2026, 4, 30))
+    assert tasks[1].start == date(2026, 2, 2) and tasks[1].pct == 40.0  # el original no se toca
+
+
+def test_rollup_without_any_values_stays_empty(gantt_tasks):
+    Task = gantt_tasks.Task
+    tasks = [Task(1, 1, "Fase"), Task(2, 2, "Detalle")]
+    phase = gantt_tasks.rollup_tasks(tasks)[id(tasks[0])]
+    assert (phase.start, phase.end, phase.pct) == (None, None, None)
+
+
+@pytest.mark.parametrize("with_calendar", [False, True])
+def test_planned_mean_with_index_matches_scan(gantt_tasks, with_calendar):
+    """El promedio planificado consultando el SpanIndex da lo mismo que recorrer todas las tareas."""
+    rng = random.Random(20)
+    tasks = []
+    for i in range(300):
+        start = date(2026, 1, 1) + timedelta(rng.randint(0, 300))
+        end = start + timedelta(rng.randint(-5, 80))  # algunas con fin < inicio
+        tasks.append(gantt_tasks.Task(i, 2, f"t{i}", start=None if i % 11 == 0 else start, end=end))
+    table = gantt_tasks.TaskTable(tasks)
+    spans = table.span_index()
+    calendar = CalendarRegistry().calendar("CL") if with_calendar else None
+    dated = [t for t in tasks if t.start and t.end]
+    dated_table = gantt_tasks.TaskTable(dated)
+    for offset in range(-10, 400, 7):
+        today = date(2026, 1, 1) + timedelta(offset)
+        expected = float(dated_table.planned_pct(today, calendar).mean())
+        assert table.planned_mean(today, calendar) == pytest.approx(expected)
+        assert table.planned_mean(today, calendar, spans) == pytest.approx(expected)
+
+
+def test_progress_targets_with_index(gantt_tasks, workbooks):
+    for path in workbooks:
+        tasks = [t for t in gantt_tasks.load_tasks_from_xlsx(path) if t.level >= 2 and t.start and t.end]
+        table = gantt_tasks.TaskTable(tasks)
+        for today in (date(2026, 1, 6), date(2026, 6, 30), date(2026, 10, 17)):
+            assert gantt_tasks.progress_targets(table, today, table.span_index()) == gantt_tasks.progress_targets(
+                table, today
+            )
+    assert gantt_tasks.TaskTable([]).planned_mean(date(2026, 1, 6)) is None
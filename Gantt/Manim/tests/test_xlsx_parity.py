@@ -0,0 +1,30 @@
+"""El lector OOXML nativo entrega las mismas filas que openpyxl."""
+
+import pytest
+
+
+def test_workbooks_present(workbooks):
+    assert workbooks, "no hay XLSX en Gantt/Smartsheets/XLSX"
+
+
+def test_ooxml_matches_openpyxl(gantt_tasks, workbooks):
+    pytest.importorskip("openpyxl")
+    for path in workbooks:
+        native = gantt_tasks.load_tasks_from_xlsx(path, engine="ooxml")
+        reference = gantt_tasks.load_tasks_from_xlsx(path, engine="openpyxl")
+        assert len(native) == len(reference), path.name
+        for ours, theirs in zip(native, reference):
+            for col, (a, b) in enumerate(zip(ours.to_row(), theirs.to_row())):
+                assert a == b, f"{path.name}: tarea {theirs.id}, columna {col}"
+
+
+def test_missing_name_header_raises_value_error(gantt_tasks, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "sin_nombre.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.append(["ID", "Estado"])
+    wb.active.append([1, "Completo"])
+    wb.save(path)
+    for engine in ("ooxml", "auto"):
+        with pytest.raises(ValueError):
+            gantt_tasks.load_tasks_from_xlsx(path, engine=engine)